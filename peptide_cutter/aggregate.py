@@ -1,7 +1,8 @@
 from __future__ import annotations
 
 import re
-from typing import Dict, List, Tuple
+from array import array
+from typing import Dict, Iterable, List, Tuple
 
 
 def _natural_key(text: str) -> Tuple:
@@ -15,14 +16,16 @@ def _natural_key(text: str) -> Tuple:
     return tuple(key)
 
 
-def build_summary(selected: List[str], sites_by_enzyme: Dict[str, List[int]]) -> Dict:
+def build_summary(
+    selected: List[str], sites_by_enzyme: Dict[str, Iterable[int]]
+) -> Dict:
     selected_sorted = sorted(selected, key=_natural_key)
     table_rows = []
     do_not_cut = []
 
-    groups: Dict[tuple[int, ...], List[str]] = {}
+    groups: Dict[bytes, Tuple[array, List[str]]] = {}
     for enzyme_name in selected_sorted:
-        sites = sorted(set(sites_by_enzyme.get(enzyme_name, [])))
+        sites = _site_array(sites_by_enzyme.get(enzyme_name, ()))
         table_rows.append(
             {
                 "name": enzyme_name,
@@ -32,18 +35,18 @@ def build_summary(selected: List[str], sites_by_enzyme: Dict[str, List[int]]) ->
         )
         if not sites:
             do_not_cut.append(enzyme_name)
-        key = tuple(sites)
+        key = sites.tobytes()
         if key not in groups:
-            groups[key] = []
-        groups[key].append(enzyme_name)
+            groups[key] = (sites, [])
+        groups[key][1].append(enzyme_name)
 
     map_groups = []
-    for sites_key, names in groups.items():
+    for group_sites, names in groups.values():
         map_groups.append(
             {
                 "name": "_".join(names),
                 "enzymes": names,
-                "sites": list(sites_key),
+                "sites": group_sites,
             }
         )
 
@@ -53,3 +56,16 @@ def build_summary(selected: List[str], sites_by_enzyme: Dict[str, List[int]]) ->
         "do_not_cut": do_not_cut,
         "groups": map_groups,
     }
+
+
+def _site_array(sites: Iterable[int]) -> array:
+    # Engines already return sorted, duplicate-free array('I') objects; only
+    # other inputs need sorting and de-duplication.
+    if isinstance(sites, array) and sites.typecode == "I":
+        return sites
+    if isinstance(sites, memoryview) and sites.format == "I":
+        # A BatchSites.record() view: copy it out of the batch buffer as is.
+        owned = array("I")
+        owned.frombytes(sites.cast("B"))
+        return owned
+    return array("I", sorted(set(sites)))
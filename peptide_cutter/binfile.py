@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import os
+import shutil
+import sys
+from array import array
+from pathlib import Path
+from typing import BinaryIO, Callable, Iterable, List
+
+
+def write_uint(f: BinaryIO, typecode: str, values: Iterable[int]) -> None:
+    """Append ``values`` to ``f`` as little-endian integers of ``typecode``."""
+    data = values if isinstance(values, array) else array(typecode, values)
+    if sys.byteorder != "little":
+        data = array(typecode, data)
+        data.byteswap()
+    f.write(data.tobytes())
+
+
+def read_uint(data, offset: int, count: int, typecode: str) -> array:
+    """Copy ``count`` little-endian integers out of ``data`` at ``offset``."""
+    values = array(typecode)
+    values.frombytes(data[offset : offset + count * values.itemsize])
+    if sys.byteorder != "little":
+        values.byteswap()
+    return values
+
+
+def align(position: int) -> int:
+    return (position + 7) & ~7
+
+
+def assemble_sections(
+    target: Path,
+    header_size: int,
+    make_header: Callable[[List[int]], bytes],
+    sections: List[Path],
+) -> None:
+    """Concatenate ``sections`` behind a header into ``target``, atomically.
+
+    Sections start on 8-byte boundaries; ``make_header`` receives their byte
+    offsets and returns the header bytes (``header_size`` long).
+    """
+    offsets: List[int] = []
+    position = align(header_size)
+    for section in sections:
+        offsets.append(position)
+        position = align(position + section.stat().st_size)
+
+    tmp_path = target.with_name(f"{target.name}.{os.getpid()}.tmp")
+    with open(tmp_path, "wb") as out:
+        out.write(make_header(offsets))
+        for section, offset in zip(sections, offsets):
+            out.write(b"\0" * (offset - out.tell()))
+            with open(section, "rb") as f:
+                shutil.copyfileobj(f, out)
+    os.replace(tmp_path, target)
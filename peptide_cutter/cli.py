@@ -1,38 +1,42 @@
 from __future__ import annotations
 
 import argparse
+import itertools
+import os
 import sys
 import re
-import shutil
 from pathlib import Path
-from typing import List
-
-from .aggregate import build_summary
-from .engine import find_cleavage_sites
-from .render import (
-    render_part3_csv,
-    render_result_parts,
-    write_part3_csv,
-    write_result_parts,
-)
-from .utils.html_report import build_html_report, build_html_index_report
-from .utils.merge_part4_txts import (
-    enzyme_abbr,
-    generate_enzyme_txts,
-    normalize_abbr,
-    render_part4_text_from_rows,
-)
+from typing import TYPE_CHECKING, Iterable, Iterator, List
+
+# Rendering and report modules are imported inside main() when their output
+# stage runs, so that argument errors, --help and engine-only work stay cheap.
+from .engine import ENGINES, find_cleavage_sites_batch
+from .pool import resolve_jobs, run_ordered
 from .rules import load_rules
 from .sequence import (
     extract_fasta_header,
+    iter_fasta_records,
     parse_fasta_records,
     parse_sequence,
     validate_sequence,
 )
 
-MAX_FASTA_RECORDS = 10000
+if TYPE_CHECKING:
+    from .manifest import RunManifest
+
+ENGINE_BATCH_SIZE = 256
+POOL_CHUNK_SIZE = 32
+# Records per chunk with --format jsonl on a pool; inline, each record is
+# written as soon as it is done.
+JSONL_CHUNK_SIZE = 4
 MERGED_CSV_NAME = "All_in_One.csv"
 MERGED_HTML_NAME = "All_in_One.html"
+MERGED_BIN_NAME = "All_in_One.pcsites"
+MERGED_JSONL_NAME = "All_in_One.jsonl"
+DEFAULT_OUTPUTS = ("csv", "html", "txt", "part4", "enzyme-txt")
+OUTPUT_STAGES = DEFAULT_OUTPUTS + ("bin",)
+# Outputs written under tmp/ rather than results/.
+INTERMEDIATE_STAGES = ("txt", "part4", "enzyme-txt")
 
 
 def main(argv: List[str] | None = None) -> int:
@@ -42,6 +46,11 @@ def main(argv: List[str] | None = None) -> int:
     group.add_argument("--fasta", help="FASTA file path")
     rules_default = Path(__file__).with_name("cleavage_rules.json")
     parser.add_argument("--rules", default=str(rules_default))
+    parser.add_argument(
+        "--no-rules-cache",
+        action="store_true",
+        help="Always parse the rules file instead of using the compiled rules cache.",
+    )
     parser.add_argument(
         "--enzymes",
         nargs="+",
@@ -52,7 +61,16 @@ def main(argv: List[str] | None = None) -> int:
     parser.add_argument(
         "--out",
         default=".",
-        help="Base output directory (default: .).",
+        help="Base output directory (default: .). With --format jsonl, the "
+        "JSON Lines file to write, or '-' for stdout.",
+    )
+    parser.add_argument(
+        "--format",
+        choices=["files", "jsonl"],
+        default="files",
+        help="'files' (default) writes the results/ and tmp/ outputs; 'jsonl' "
+        "streams one JSON object per record (chain id, length and sites per "
+        "enzyme) as records finish, without results/ or tmp/.",
     )
     parser.add_argument(
         "--line-width",
@@ -60,6 +78,75 @@ def main(argv: List[str] | None = None) -> int:
         default=60,
         help="Line width for sequence display and Part 4 blocks (10-60).",
     )
+    parser.add_argument(
+        "--engine",
+        choices=sorted(ENGINES),
+        default="scan",
+        help="Cleavage engine: 'scan' (default, single pass over each sequence), "
+        "'reference' (per-enzyme loop), 'indexed' (candidate positions from a "
+        "residue index), 'regex' (compiled bond patterns) or 'numpy' "
+        "(vectorized, requires NumPy).",
+    )
+    parser.add_argument(
+        "--fragments",
+        action="store_true",
+        help="Also write the digestion products of the selected enzymes to "
+        "results/fragments/<chain>_fragments.csv.",
+    )
+    _add_fragment_arguments(parser, "with --fragments, ")
+    parser.add_argument(
+        "--ids",
+        nargs="+",
+        help="Only process these FASTA accessions (requires --fasta). Records "
+        "are read through a reusable byte-offset index next to the FASTA.",
+    )
+    parser.add_argument(
+        "--ids-file",
+        help="File with one FASTA accession per line to process (requires --fasta).",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Number of worker processes for per-record processing "
+        "(default: 1, 0 = all CPUs).",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Reuse per-record outputs that the results manifest shows are up "
+        "to date (same sequence, rules file, enzymes, line width and outputs) "
+        "and only rebuild the merged outputs, e.g. to continue after a crash.",
+    )
+    parser.add_argument(
+        "--outputs",
+        default=",".join(DEFAULT_OUTPUTS),
+        help="Comma-separated outputs to produce: 'csv' (per-chain and merged "
+        "CSV), 'html' (per-chain and merged reports), 'txt' (Part 1-3 TXT), "
+        "'part4' (Part 4 TXT), 'enzyme-txt' (per-enzyme TXT) and 'bin' "
+        f"(memory-mappable results/{MERGED_BIN_NAME}). Stages not listed are "
+        "skipped entirely (default: all but bin).",
+    )
+    parser.add_argument(
+        "--no-intermediates",
+        action="store_true",
+        help="Do not write the tmp/ outputs (txt, part4, enzyme-txt); Part 4 "
+        "and the other renderings stay in memory and only feed results/.",
+    )
+    parser.add_argument(
+        "--index-page-size",
+        type=int,
+        default=0,
+        help=f"Split {MERGED_HTML_NAME} into pages of at most this many chains, "
+        "linked from a searchable table of contents and listed in a JSON index "
+        "(default: 0, one page).",
+    )
+    parser.add_argument(
+        "--external-css",
+        action="store_true",
+        help="Write the report stylesheet once to results/report/assets/ and "
+        "link it from every HTML report instead of inlining it.",
+    )
     parser.add_argument(
         "--cleanup-tmp",
         action="store_true",
@@ -75,102 +162,163 @@ def main(argv: List[str] | None = None) -> int:
     try:
         if not 10 <= args.line_width <= 60:
             raise ValueError("--line-width must be between 10 and 60.")
-        rules = load_rules(args.rules)
+        fragment_options = _fragment_options(args) if args.fragments else None
+        if args.index_page_size < 0:
+            raise ValueError("--index-page-size must not be negative.")
+        stages = _parse_outputs(args.outputs)
+        if args.no_intermediates and set(stages) <= set(INTERMEDIATE_STAGES):
+            raise ValueError("--no-intermediates leaves no --outputs to produce.")
+        if args.format == "jsonl":
+            _check_jsonl_args(args)
+        elif args.out == "-":
+            raise ValueError("--out - requires --format jsonl.")
+        rules = load_rules(args.rules, use_cache=not args.no_rules_cache)
         selected = _select_enzymes(args.enzymes, rules)
 
-        text = _load_input_text(args.seq, args.fasta)
-        records = _parse_input_records(text)
-        if not records:
+        ids = _load_requested_ids(args.ids, args.ids_file)
+        if ids is not None and not args.fasta:
+            raise ValueError("--ids/--ids-file require --fasta.")
+        records = _iter_input_records(args.seq, args.fasta, ids)
+        first = next(records, None)
+        if first is None:
             raise ValueError("No FASTA records found in input.")
+        records = itertools.chain([first], records)
+
+        jobs = resolve_jobs(args.jobs)
+        if args.format == "jsonl":
+            settings = {
+                "rules": rules,
+                "selected": selected,
+                "engine": args.engine,
+            }
+            return _stream_jsonl(records, settings, jobs, args.out)
+
+        from .manifest import RunManifest, sha256_file
 
         chain_counts: dict[str, int] = {}
         safe_counts: dict[str, int] = {}
-        merged_csv_parts: List[str] = []
-        merged_records: List[dict] = []
+        safe_ids: List[str] = []
         report_dir, csv_dir = _resolve_output_dirs(args.out)
-        for accession, description, raw_seq in records:
-            chain_id = _reserve_chain_id(accession, chain_counts)
-            seq, meta = validate_sequence(raw_seq, strict=True)
-            if not seq:
-                raise ValueError(f"Empty sequence for record: {accession}")
-            meta["accession"] = chain_id
-            meta["description"] = description
-
-            output_id = _reserve_safe_id(chain_id, safe_counts)
-            sites_by_enzyme = find_cleavage_sites(seq, rules, selected)
-            summary = build_summary(selected, sites_by_enzyme)
-            parts = render_result_parts(seq, meta, selected, summary, args.line_width)
-
-            html_out = report_dir / f"{output_id}_report.html"
-            txt_base = html_out.with_suffix(".txt")
-
-            write_result_parts(str(txt_base), parts)
-            part3_csv = render_part3_csv(
-                summary,
-                chain_id=chain_id,
-                include_header=not merged_csv_parts,
-            )
-            if part3_csv:
-                merged_csv_parts.append(part3_csv)
-            per_chain_csv = render_part3_csv(summary)
-            if per_chain_csv:
-                per_chain_path = csv_dir / f"{output_id}.csv"
-                write_part3_csv(str(per_chain_path), per_chain_csv)
-            enzyme_dir = Path("tmp") / "enzyme_txts" / output_id
-            rows = [
-                (row["name"], row["sites"])
-                for row in summary["table_rows"]
-                if row["count"] > 0
-            ]
-            generate_enzyme_txts(
-                rows=rows,
-                seq_id=meta.get("accession", "SEQ"),
-                seq=seq,
-                out_dir=enzyme_dir,
-                block_size=args.line_width,
-            )
-            part4_text = render_part4_text_from_rows(
-                rows=rows,
-                seq=seq,
-                block_size=args.line_width,
-            )
-            part4_path = Path("tmp") / "parts_txts" / f"{txt_base.stem}_part4.txt"
-            part4_path.write_text(part4_text, encoding="utf-8")
-
-            html = build_html_report(
-                seq=seq,
-                meta=meta,
-                summary=summary,
-                line_width=args.line_width,
-                part4_text=part4_text,
-            )
-            html_out.write_text(html, encoding="utf-8")
-            merged_records.append(
-                {
-                    "chain_id": chain_id,
-                    "safe_id": output_id,
-                    "seq": seq,
-                    "meta": meta,
-                    "summary": summary,
-                    "part4_text": part4_text,
-                }
+        # All_in_One.csv is written record by record to a temporary file
+        # that replaces the merged CSV once the run has finished.
+        merged_csv_path = csv_dir / MERGED_CSV_NAME
+        merged_csv_tmp = csv_dir / f"{MERGED_CSV_NAME}.{os.getpid()}.tmp"
+        merged_csv = None
+        manifest = RunManifest(report_dir.parent, resume=args.resume)
+        index_writer = None
+        sites_writer = None
+        stylesheet = None
+        # The writers hold temporary files; they are created inside the
+        # guarded block so that every error path removes them.
+        try:
+            if "html" in stages:
+                from .utils.html_report import (
+                    STYLESHEET_PATH,
+                    HtmlIndexWriter,
+                    write_stylesheet,
+                )
+
+                if args.external_css:
+                    write_stylesheet(report_dir)
+                    stylesheet = STYLESHEET_PATH
+                index_writer = HtmlIndexWriter(
+                    args.line_width,
+                    title="PeptideCutter Report",
+                    spool_dir=report_dir,
+                    page_size=args.index_page_size,
+                    name=Path(MERGED_HTML_NAME).stem,
+                    stylesheet=stylesheet,
+                )
+            if "bin" in stages:
+                from .results_file import ResultsFileWriter
+
+                sites_writer = ResultsFileWriter(
+                    str(report_dir.parent / MERGED_BIN_NAME), selected
+                )
+            settings = {
+                "rules": rules,
+                "rules_hash": sha256_file(args.rules),
+                "selected": selected,
+                "engine": args.engine,
+                "line_width": args.line_width,
+                "report_dir": report_dir,
+                "csv_dir": csv_dir,
+                "fragments": fragment_options,
+                "outputs": stages,
+                "intermediates": not args.no_intermediates,
+                "stylesheet": stylesheet,
+            }
+            # A first pass over the input finds the repeated sequences, so
+            # each distinct sequence is computed once whichever worker gets
+            # it. Pipes and other streams can only be read once and get no
+            # sharing.
+            repeats: dict[bytes, int] = {}
+            if args.fasta is None or Path(args.fasta).is_file():
+                repeats = _repeated_sequences(
+                    _iter_input_records(args.seq, args.fasta, ids)
+                )
+            planner = _RecordPlanner(settings, manifest, repeats)
+            chunks = _prepare_chunks(
+                records,
+                chain_counts,
+                safe_counts,
+                ENGINE_BATCH_SIZE if jobs == 1 else POOL_CHUNK_SIZE,
+                planner=planner,
             )
+            for record in _run_chunks(chunks, settings, jobs):
+                if record["manifest_entry"] is not None:
+                    manifest.append(record.pop("manifest_entry"))
+                safe_ids.append(record["safe_id"])
+                if sites_writer is not None:
+                    sites_writer.add(
+                        record["chain_id"],
+                        {
+                            row["name"]: row["sites"]
+                            for row in record["summary"]["table_rows"]
+                        },
+                    )
+                if "csv" in stages:
+                    from .render import render_part3_csv
+
+                    part3_csv = render_part3_csv(
+                        record["summary"],
+                        chain_id=record["chain_id"],
+                        include_header=merged_csv is None,
+                    )
+                    if merged_csv is None:
+                        merged_csv = open(merged_csv_tmp, "w", encoding="utf-8")
+                    merged_csv.write(part3_csv)
+                if index_writer is not None:
+                    index_writer.add(record)
+            if sites_writer is not None:
+                sites_writer.close()
+            if merged_csv is not None:
+                merged_csv.close()
+        except BaseException:
+            if merged_csv is not None:
+                merged_csv.close()
+                merged_csv_tmp.unlink()
+            if sites_writer is not None:
+                sites_writer.discard()
+            if index_writer is not None:
+                index_writer.close()
+            raise
+        finally:
+            manifest.close()
+        manifest.finalize(safe_ids)
 
         merged_outputs: List[Path] = []
-        if merged_csv_parts:
-            merged_csv_text = "".join(merged_csv_parts)
-            merged_csv_path = csv_dir / MERGED_CSV_NAME
-            write_part3_csv(str(merged_csv_path), merged_csv_text)
+        if merged_csv is not None:
+            os.replace(merged_csv_tmp, merged_csv_path)
             merged_outputs.append(merged_csv_path)
-        if merged_records:
-            index_html = build_html_index_report(
-                records=merged_records,
-                line_width=args.line_width,
-                title="PeptideCutter Report",
-            )
-            report_path = report_dir / MERGED_HTML_NAME
-            report_path.write_text(index_html, encoding="utf-8")
-            merged_outputs.append(report_path)
+        if index_writer is not None:
+            with index_writer:
+                if len(index_writer):
+                    index_paths = index_writer.save(report_dir)
+                    # A paginated index or one linking the shared stylesheet
+                    # needs its neighbours and stays in the report directory.
+                    if not args.index_page_size and stylesheet is None:
+                        merged_outputs.extend(index_paths)
         if merged_outputs:
             _copy_to_cwd(merged_outputs)
         if args.tar_results:
@@ -179,6 +327,8 @@ def main(argv: List[str] | None = None) -> int:
         if args.cleanup_tmp:
             tmp_dir = Path("tmp")
             if tmp_dir.exists():
+                import shutil
+
                 shutil.rmtree(tmp_dir)
         return 0
     except Exception as exc:  # noqa: BLE001
@@ -186,25 +336,669 @@ def main(argv: List[str] | None = None) -> int:
         return 1
 
 
-def _load_input_text(seq_arg: str | None, fasta_path: str | None) -> str:
+def index_main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="PeptideCutter peptide index: which proteins produce a peptide."
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build = commands.add_parser(
+        "build", help="Digest every FASTA record and write a peptide index."
+    )
+    build.add_argument("--fasta", required=True, help="FASTA file path")
+    rules_default = Path(__file__).with_name("cleavage_rules.json")
+    build.add_argument("--rules", default=str(rules_default))
+    build.add_argument(
+        "--no-rules-cache",
+        action="store_true",
+        help="Always parse the rules file instead of using the compiled rules cache.",
+    )
+    build.add_argument(
+        "--enzymes",
+        nargs="+",
+        required=True,
+        help="Enzyme names or abbreviations, or 'all'; the proteins are digested "
+        "by all of them together.",
+    )
+    build.add_argument("--out", required=True, help="Index file to write.")
+    build.add_argument(
+        "--engine",
+        choices=sorted(ENGINES),
+        default="scan",
+        help="Cleavage engine (default: scan).",
+    )
+    build.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Number of worker processes (default: 1, 0 = all CPUs).",
+    )
+    _add_fragment_arguments(build, "")
+
+    lookup = commands.add_parser(
+        "lookup", help="Print the proteins and positions producing each peptide."
+    )
+    lookup.add_argument("--index", required=True, help="Index file to read.")
+    lookup.add_argument("peptides", nargs="+", help="Peptide sequences.")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == "build":
+            from .peptide_index import build_peptide_index
+
+            fragment_options = _fragment_options(args)
+            jobs = resolve_jobs(args.jobs)
+            rules = load_rules(args.rules, use_cache=not args.no_rules_cache)
+            selected = _select_enzymes(args.enzymes, rules)
+            peptides, postings, proteins = build_peptide_index(
+                _iter_input_records(None, args.fasta),
+                args.out,
+                rules,
+                selected,
+                fragment_options=fragment_options,
+                engine=args.engine,
+                jobs=jobs,
+            )
+            print(
+                f"Indexed {peptides} peptides ({postings} occurrences) "
+                f"from {proteins} proteins into {args.out}"
+            )
+            return 0
+
+        from .peptide_index import PeptideIndex
+
+        missing = 0
+        with PeptideIndex(args.index) as index:
+            for peptide in args.peptides:
+                hits = index.lookup(peptide)
+                if not hits:
+                    print(f"Not found: {peptide}", file=sys.stderr)
+                    missing += 1
+                for hit in hits:
+                    print(f"{peptide.upper()}\t{hit.protein}\t{hit.start}\t{hit.end}")
+        return 1 if missing else 0
+    except Exception as exc:  # noqa: BLE001
+        print(f"Error: {exc}", file=sys.stderr)
+        return 1
+
+
+def _check_jsonl_args(args: argparse.Namespace) -> None:
+    conflicts = [
+        flag
+        for flag, used in (
+            ("--fragments", args.fragments),
+            ("--resume", args.resume),
+            ("--tar-results", args.tar_results),
+            ("--index-page-size", args.index_page_size != 0),
+            ("--external-css", args.external_css),
+            ("--outputs", args.outputs != ",".join(DEFAULT_OUTPUTS)),
+        )
+        if used
+    ]
+    if conflicts:
+        raise ValueError(
+            "--format jsonl cannot be combined with " + ", ".join(conflicts)
+        )
+
+
+def _stream_jsonl(
+    records: Iterable[tuple[str, str, str]],
+    settings: dict,
+    jobs: int,
+    out_arg: str,
+) -> int:
+    """Write one JSON line per record, flushed as soon as its chunk finishes.
+
+    Chunks hold a single record inline and a few records on a pool, so
+    output starts with the first record rather than after a full batch.
+    """
+    chunks = _prepare_chunks(records, {}, {}, 1 if jobs == 1 else JSONL_CHUNK_SIZE)
+    if out_arg == "-":
+        handle = sys.stdout
+    else:
+        path = Path(out_arg)
+        if not path.suffix:
+            path = path / MERGED_JSONL_NAME
+        path.parent.mkdir(parents=True, exist_ok=True)
+        handle = open(path, "w", encoding="utf-8")
+    try:
+        for lines in run_ordered(
+            chunks, _summarize_chunk, jobs, _init_worker, (settings,)
+        ):
+            handle.write("".join(lines))
+            handle.flush()
+    except BrokenPipeError:
+        # The reading end (e.g. `head`) closed early; that is not an error.
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+    finally:
+        if handle is not sys.stdout:
+            handle.close()
+    return 0
+
+
+def _summarize_chunk(chunk: List[dict]) -> List[str]:
+    """Return the JSON line of each record of one chunk, in order."""
+    import json
+
+    from .aggregate import build_summary
+
+    selected = _WORKER_SETTINGS["selected"]
+    batch = find_cleavage_sites_batch(
+        [item["seq"] for item in chunk],
+        _WORKER_SETTINGS["rules"],
+        selected,
+        engine=_WORKER_SETTINGS["engine"],
+    )
+    lines: List[str] = []
+    for index, item in enumerate(chunk):
+        summary = build_summary(selected, batch.record(index))
+        record = {
+            "chain_id": item["chain_id"],
+            "length": len(item["seq"]),
+            "sites": {
+                row["name"]: row["sites"].tolist() for row in summary["table_rows"]
+            },
+        }
+        lines.append(json.dumps(record, ensure_ascii=False) + "\n")
+    return lines
+
+
+def _parse_outputs(text: str) -> List[str]:
+    requested = [item.strip().lower() for item in text.split(",") if item.strip()]
+    unknown = sorted(set(requested) - set(OUTPUT_STAGES))
+    if unknown:
+        raise ValueError(
+            "Unknown --outputs: "
+            + ", ".join(unknown)
+            + " (choose from "
+            + ", ".join(OUTPUT_STAGES)
+            + ")"
+        )
+    if not requested:
+        raise ValueError("--outputs must name at least one output.")
+    return [stage for stage in OUTPUT_STAGES if stage in requested]
+
+
+def _add_fragment_arguments(parser: argparse.ArgumentParser, when: str) -> None:
+    parser.add_argument(
+        "--missed-cleavages",
+        type=int,
+        default=0,
+        help=f"Maximum missed cleavages per fragment ({when}default 0).",
+    )
+    parser.add_argument(
+        "--min-length",
+        type=int,
+        default=1,
+        help=f"Minimum fragment length in residues ({when}default 1).",
+    )
+    parser.add_argument(
+        "--max-length",
+        type=int,
+        help=f"Maximum fragment length in residues ({when}default none).",
+    )
+    parser.add_argument(
+        "--min-mass",
+        type=float,
+        help=f"Minimum fragment mass in Da ({when}default none).",
+    )
+    parser.add_argument(
+        "--max-mass",
+        type=float,
+        help=f"Maximum fragment mass in Da ({when}default none).",
+    )
+    parser.add_argument(
+        "--mass-type",
+        choices=["monoisotopic", "average"],
+        default="monoisotopic",
+        help=f"Residue masses used for fragment masses ({when}default monoisotopic).",
+    )
+
+
+def _fragment_options(args: argparse.Namespace) -> dict:
+    if args.missed_cleavages < 0:
+        raise ValueError("--missed-cleavages must be 0 or positive.")
+    if args.min_length < 1:
+        raise ValueError("--min-length must be at least 1.")
+    if args.max_length is not None and args.max_length < args.min_length:
+        raise ValueError("--max-length must not be below --min-length.")
+    if (
+        args.min_mass is not None
+        and args.max_mass is not None
+        and args.max_mass < args.min_mass
+    ):
+        raise ValueError("--max-mass must not be below --min-mass.")
+    return {
+        "missed_cleavages": args.missed_cleavages,
+        "min_length": args.min_length,
+        "max_length": args.max_length,
+        "min_mass": args.min_mass,
+        "max_mass": args.max_mass,
+        "mass_type": args.mass_type,
+    }
+
+
+def _prepare_chunks(
+    records: Iterable[tuple[str, str, str]],
+    chain_counts: dict[str, int],
+    safe_counts: dict[str, int],
+    size: int,
+    planner: "_RecordPlanner | None" = None,
+) -> Iterator[List[dict]]:
+    """Validate records and reserve their ids in input order, in chunks.
+
+    With a ``planner`` each record is also matched against the manifest of
+    the run being resumed and against earlier records with the same sequence
+    (see :class:`_RecordPlanner`), so workers only see what their chunk needs.
+    """
+    chunk: List[dict] = []
+    for accession, description, raw_seq in records:
+        chain_id = _reserve_chain_id(accession, chain_counts)
+        seq, meta = validate_sequence(raw_seq, strict=True)
+        if not seq:
+            raise ValueError(f"Empty sequence for record: {accession}")
+        meta["accession"] = chain_id
+        meta["description"] = description
+        output_id = _reserve_safe_id(chain_id, safe_counts)
+        item = {"chain_id": chain_id, "safe_id": output_id, "seq": seq, "meta": meta}
+        if planner is not None:
+            planner.plan(item)
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _repeated_sequences(
+    records: Iterable[tuple[str, str, str]],
+) -> dict[bytes, int]:
+    """Occurrence counts of the sequences that appear more than once, keyed by
+    the SHA-256 digest of the sequence."""
+    import hashlib
+
+    counts: dict[bytes, int] = {}
+    for _, _, raw_seq in records:
+        key = hashlib.sha256(raw_seq.upper().encode("utf-8")).digest()
+        counts[key] = counts.get(key, 0) + 1
+    return {key: count for key, count in counts.items() if count > 1}
+
+
+class _RecordPlanner:
+    """Decide in the main process how each record of a run is produced.
+
+    A record whose manifest entry is still current is rebuilt from the sites
+    in that entry. Of the other records sharing a sequence only the first is
+    computed (marked ``share``); the later ones (marked ``dup``) are not
+    processed by the workers, and the caller fans the first record's shared
+    result out to them. ``repeats`` holds the occurrence counts of repeated
+    sequences, so the shared result is dropped after its last occurrence
+    (marked ``release``) instead of being kept for the rest of the run.
+    """
+
+    def __init__(
+        self, settings: dict, manifest: RunManifest, repeats: dict[bytes, int]
+    ) -> None:
+        self.settings = settings
+        self.manifest = manifest
+        self.remaining = dict(repeats)
+        self.computed: set[bytes] = set()
+
+    def plan(self, item: dict) -> None:
+        from .manifest import entry_is_current, record_fingerprint
+
+        settings = self.settings
+        fingerprint = record_fingerprint(
+            item["seq"],
+            settings["rules_hash"],
+            settings["selected"],
+            settings["line_width"],
+            fragments=settings["fragments"],
+            stages=settings["outputs"],
+            stylesheet=settings["stylesheet"],
+            intermediates=any(
+                stage in INTERMEDIATE_STAGES for stage in _active_stages(settings)
+            ),
+        )
+        entry = self.manifest.previous_entry(item["safe_id"])
+        if not entry_is_current(entry, fingerprint, settings["report_dir"].parent):
+            entry = None
+        key = bytes.fromhex(fingerprint["seq_sha256"])
+        item.update(fingerprint=fingerprint, entry=entry, key=key)
+
+        left = self.remaining.get(key)
+        if left is None:
+            return
+        left -= 1
+        if entry is None:
+            if key in self.computed:
+                item["dup"] = True
+            elif left:
+                item["share"] = True
+                self.computed.add(key)
+        if left:
+            self.remaining[key] = left
+        else:
+            del self.remaining[key]
+            if key in self.computed:
+                self.computed.discard(key)
+                item["release"] = True
+
+
+def _run_chunks(
+    chunks: Iterable[List[dict]],
+    settings: dict,
+    jobs: int,
+) -> Iterator[dict]:
+    """Process chunks inline or on a process pool, yielding records in order.
+
+    Records repeating an earlier sequence come back from the workers
+    unprocessed and get their outputs here, from the shared result of the
+    first record with that sequence.
+    """
+    shared_by_key: dict[bytes, dict] = {}
+    for results in run_ordered(chunks, _process_chunk, jobs, _init_worker, (settings,)):
+        for record in results:
+            if record.get("dup"):
+                record = _write_record(record, shared_by_key[record["key"]], settings)
+            elif "shared" in record:
+                shared_by_key[record["key"]] = record.pop("shared")
+            if record.get("release"):
+                del shared_by_key[record["key"]]
+            yield record
+
+
+_WORKER_SETTINGS: dict = {}
+
+
+def _init_worker(settings: dict) -> None:
+    _WORKER_SETTINGS.clear()
+    _WORKER_SETTINGS.update(settings)
+
+
+def _process_chunk(chunk: List[dict]) -> List[dict]:
+    """Compute and write the per-record outputs of one chunk.
+
+    Runs in pool workers as well as inline; only per-record files are written
+    here, the merged outputs are assembled by the caller in input order.
+    Records whose manifest entry is still current are not recomputed, and
+    records marked ``dup`` are handed back as they are (see _run_chunks).
+    """
+    settings = _WORKER_SETTINGS
+    pending = [item for item in chunk if item["entry"] is None and not item.get("dup")]
+    batch = find_cleavage_sites_batch(
+        [item["seq"] for item in pending],
+        settings["rules"],
+        settings["selected"],
+        engine=settings["engine"],
+    )
+    computed: dict[str, dict] = {}
+    for index, item in enumerate(pending):
+        shared = _share_sequence(item["seq"], batch.record(index), settings)
+        record = _write_record(item, shared, settings)
+        if item.get("share"):
+            record["shared"] = shared
+        computed[item["safe_id"]] = record
+
+    results: List[dict] = []
+    for item in chunk:
+        if item.get("dup"):
+            results.append(item)
+        elif item["entry"] is not None:
+            results.append(_reuse_record(item, settings))
+        else:
+            results.append(computed[item["safe_id"]])
+    return results
+
+
+def _active_stages(settings: dict) -> List[str]:
+    # Fingerprints follow --outputs: --no-intermediates only keeps the tmp/
+    # stages from being written, and results/ is the same either way. Runs
+    # that write them also check the recorded tmp/ files (entry_is_current).
+    stages = settings["outputs"]
+    if not settings["intermediates"]:
+        stages = [stage for stage in stages if stage not in INTERMEDIATE_STAGES]
+    return stages
+
+
+def _share_sequence(seq: str, sites_by_enzyme: dict, settings: dict) -> dict:
+    """Return the sequence-dependent results shared by records with ``seq``."""
+    from .aggregate import build_summary
+
+    stages = _active_stages(settings)
+    line_width = settings["line_width"]
+    summary = build_summary(settings["selected"], sites_by_enzyme)
+    rows = _cut_rows(summary)
+    shared = {
+        # The owned arrays of the summary rather than the batch views, so
+        # the shared result can be pickled.
+        "sites": {row["name"]: row["sites"] for row in summary["table_rows"]},
+        "summary": summary,
+        "rows": rows,
+        "part4_text": None,
+    }
+    # Only the modules of the requested output stages are loaded.
+    if "txt" in stages:
+        from .render import render_sequence_display
+
+        shared["sequence_display"] = render_sequence_display(seq, line_width)
+    if "csv" in stages:
+        from .render import render_part3_csv
+
+        shared["per_chain_csv"] = render_part3_csv(summary)
+    if "part4" in stages or "html" in stages or "enzyme-txt" in stages:
+        from .utils.merge_part4_txts import Part4Layout
+
+        # One layout per sequence feeds both the merged Part 4 track and the
+        # per-enzyme TXTs.
+        shared["part4_layout"] = Part4Layout(seq, rows, line_width)
+    if "part4" in stages or "html" in stages:
+        shared["part4_text"] = shared["part4_layout"].merged_text()
+    if "html" in stages:
+        from .utils.html_report import render_report_sections
+
+        shared["sections"] = render_report_sections(
+            seq, summary, line_width, shared["part4_text"]
+        )
+    return shared
+
+
+def _write_record(item: dict, shared: dict, settings: dict) -> dict:
+    """Write the per-record files of ``item`` from the ``shared`` results of
+    its sequence; only the accession-specific headers are rendered here."""
+    stages = _active_stages(settings)
+    line_width = settings["line_width"]
+    report_dir = settings["report_dir"]
+    results_dir = report_dir.parent
+    fragment_options = settings["fragments"]
+    chain_id, output_id = item["chain_id"], item["safe_id"]
+    seq, meta = item["seq"], item["meta"]
+    sites_by_enzyme = shared["sites"]
+    summary = shared["summary"]
+    part4_text = shared["part4_text"]
+
+    html_out = report_dir / f"{output_id}_report.html"
+    txt_base = html_out.with_suffix(".txt")
+    outputs: List[Path] = []
+    tmp_outputs: List[Path] = []
+
+    if "txt" in stages:
+        from .render import render_result_parts, write_result_parts
+
+        parts = render_result_parts(
+            seq,
+            meta,
+            settings["selected"],
+            summary,
+            line_width,
+            sequence_display=shared["sequence_display"],
+        )
+        tmp_outputs.extend(write_result_parts(str(txt_base), parts))
+    if "html" in stages:
+        from .utils.html_report import build_html_report
+
+        html = build_html_report(
+            seq=seq,
+            meta=meta,
+            summary=summary,
+            line_width=line_width,
+            part4_text=part4_text,
+            sections=shared["sections"],
+            stylesheet=settings["stylesheet"],
+        )
+        html_out.write_text(html, encoding="utf-8")
+        outputs.append(html_out)
+    if "csv" in stages and shared["per_chain_csv"]:
+        from .render import write_part3_csv
+
+        per_chain_path = settings["csv_dir"] / f"{output_id}.csv"
+        write_part3_csv(str(per_chain_path), shared["per_chain_csv"])
+        outputs.append(per_chain_path)
+    if "enzyme-txt" in stages:
+        from .utils.merge_part4_txts import generate_enzyme_txts
+
+        enzyme_dir = Path("tmp") / "enzyme_txts" / output_id
+        generate_enzyme_txts(
+            rows=shared["rows"],
+            seq_id=meta.get("accession", "SEQ"),
+            seq=seq,
+            out_dir=enzyme_dir,
+            block_size=line_width,
+            layout=shared["part4_layout"],
+        )
+        tmp_outputs.append(enzyme_dir)
+    if "part4" in stages:
+        part4_path = Path("tmp") / "parts_txts" / f"{txt_base.stem}_part4.txt"
+        part4_path.parent.mkdir(parents=True, exist_ok=True)
+        part4_path.write_text(part4_text, encoding="utf-8")
+        tmp_outputs.append(part4_path)
+    if fragment_options is not None:
+        from .fragments import iter_fragments, write_fragments_csv
+
+        fragments_path = results_dir / "fragments" / f"{output_id}_fragments.csv"
+        write_fragments_csv(
+            str(fragments_path),
+            iter_fragments(seq, sites_by_enzyme, **fragment_options),
+        )
+        outputs.append(fragments_path)
+
+    record = _new_record(item, summary, part4_text)
+    record["sections"] = shared.get("sections")
+    record["manifest_entry"] = dict(
+        item["fingerprint"],
+        safe_id=output_id,
+        chain_id=chain_id,
+        outputs=[path.relative_to(results_dir).as_posix() for path in outputs],
+        sites={name: sites.tolist() for name, sites in sites_by_enzyme.items()},
+    )
+    if tmp_outputs:
+        record["manifest_entry"]["tmp_outputs"] = [
+            Path(os.path.relpath(path, results_dir)).as_posix()
+            for path in tmp_outputs
+        ]
+    return record
+
+
+def _reuse_record(item: dict, settings: dict) -> dict:
+    """Rebuild the merged-output data of a record from its manifest entry."""
+    from .aggregate import build_summary
+
+    stages = _active_stages(settings)
+    summary = build_summary(settings["selected"], item["entry"]["sites"])
+    part4_text = None
+    if "part4" in stages or "html" in stages:
+        from .utils.merge_part4_txts import Part4Layout
+
+        # The Part 4 layout is deterministic, so the manifest keeps only the
+        # sites and the track is laid out again from them.
+        part4_text = Part4Layout(
+            item["seq"], _cut_rows(summary), settings["line_width"]
+        ).merged_text()
+    return _new_record(item, summary, part4_text)
+
+
+def _new_record(item: dict, summary: dict, part4_text: str | None) -> dict:
+    return {
+        "chain_id": item["chain_id"],
+        "safe_id": item["safe_id"],
+        "seq": item["seq"],
+        "meta": item["meta"],
+        "key": item["key"],
+        "release": item.get("release", False),
+        "summary": summary,
+        "part4_text": part4_text,
+        "manifest_entry": None,
+    }
+
+
+def _cut_rows(summary: dict) -> List[tuple[str, object]]:
+    """``(enzyme, sites)`` of the enzymes that cut, as Part 4 lays them out."""
+    return [
+        (row["name"], row["sites"])
+        for row in summary["table_rows"]
+        if row["count"] > 0
+    ]
+
+
+def _load_requested_ids(
+    ids: List[str] | None, ids_file: str | None
+) -> List[str] | None:
+    if ids is None and ids_file is None:
+        return None
+    requested: List[str] = []
+    for item in ids or []:
+        requested.extend(part.strip() for part in item.split(",") if part.strip())
+    if ids_file:
+        path = Path(ids_file)
+        if not path.exists():
+            raise ValueError(f"IDs file not found: {ids_file}")
+        for line in path.read_text(encoding="utf-8").splitlines():
+            line = line.strip()
+            if line and not line.startswith("#"):
+                requested.append(line)
+    if not requested:
+        raise ValueError("No accessions given in --ids/--ids-file.")
+    return requested
+
+
+def _iter_input_records(
+    seq_arg: str | None,
+    fasta_path: str | None,
+    ids: List[str] | None = None,
+) -> Iterator[tuple[str, str, str]]:
     if fasta_path:
         path = Path(fasta_path)
         if not path.exists():
             raise ValueError(f"FASTA file not found: {fasta_path}")
-        return path.read_text(encoding="utf-8")
+        if ids is not None:
+            from .fasta_index import read_fasta_records
+
+            yield from read_fasta_records(fasta_path, ids)
+            return
+        with path.open("r", encoding="utf-8") as handle:
+            # Peek at the first non-blank line to tell FASTA from raw input;
+            # FASTA files are then streamed record by record.
+            head: List[str] = []
+            for line in handle:
+                head.append(line)
+                if line.strip():
+                    break
+            if head and head[-1].lstrip().startswith(">"):
+                yield from iter_fasta_records(itertools.chain(head, handle))
+            else:
+                yield from _parse_input_records("".join(head) + handle.read())
+        return
     if seq_arg is not None:
-        return seq_arg
+        yield from _parse_input_records(seq_arg)
+        return
     raise ValueError("Either --seq or --fasta must be provided.")
 
 
 def _parse_input_records(text: str) -> List[tuple[str, str, str]]:
     if _looks_like_fasta(text):
-        records = parse_fasta_records(text, max_records=MAX_FASTA_RECORDS)
-        if len(records) > MAX_FASTA_RECORDS:
-            raise ValueError(
-                f"FASTA contains more than {MAX_FASTA_RECORDS} records."
-            )
-        return records
+        return parse_fasta_records(text)
     accession, description = extract_fasta_header(text)
     seq = parse_sequence(text)
     return [(accession, description, seq)]
@@ -228,13 +1022,7 @@ def _select_enzymes(requested: List[str], rules) -> List[str]:
 
     full_names = list(rules.enzymes.keys())
     full_by_lower = {name.lower(): name for name in full_names}
-    abbr_map: dict[str, str] = {}
-    for name in full_names:
-        try:
-            abbr = normalize_abbr(enzyme_abbr(name)).lower()
-        except Exception:
-            continue
-        abbr_map.setdefault(abbr, name)
+    abbr_map: dict[str, str] | None = None
 
     resolved: List[str] = []
     missing: List[str] = []
@@ -246,6 +1034,16 @@ def _select_enzymes(requested: List[str], rules) -> List[str]:
         if lower in full_by_lower:
             resolved.append(full_by_lower[lower])
             continue
+        from .utils.merge_part4_txts import enzyme_abbr, normalize_abbr
+
+        if abbr_map is None:
+            abbr_map = {}
+            for name in full_names:
+                try:
+                    abbr = normalize_abbr(enzyme_abbr(name)).lower()
+                except Exception:
+                    continue
+                abbr_map.setdefault(abbr, name)
         abbr = normalize_abbr(token).lower()
         if abbr in abbr_map:
             resolved.append(abbr_map[abbr])
@@ -326,6 +1124,8 @@ def _sanitize_id(value: str) -> str:
 
 
 def _copy_to_cwd(paths: List[Path]) -> None:
+    import shutil
+
     cwd = Path.cwd()
     for path in paths:
         if not path.exists():
@@ -346,6 +1146,8 @@ def _tar_results(out_arg: str) -> None:
     results_dir = base_dir if base_dir.name == "results" else base_dir / "results"
     if not results_dir.exists():
         return
+    import shutil
+
     tar_base = results_dir.parent / "clvg_site_pred_results"
     shutil.make_archive(str(tar_base), "gztar", root_dir=results_dir)
 
@@ -1,47 +1,420 @@
 from __future__ import annotations
 
-from typing import Dict, List
+import re
+from array import array
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, MutableSequence, Sequence, Tuple
 
-from .rules import EnzymeRule, Motif, RulesDB
+from .rules import (
+    PAD_LEFT,
+    PAD_RIGHT,
+    CompiledMotif,
+    CompiledRule,
+    RulesDB,
+    compile_rule,
+    encode_sequence,
+    residue_bit,
+)
+
+_Checks = Tuple[Tuple[int, int], ...]
+_DispatchEntry = Tuple[int, List[_Checks], List[_Checks]]
 
 
 def find_cleavage_sites(
     seq: str, rules: RulesDB, enzymes: List[str]
-) -> Dict[str, List[int]]:
-    sites_by_enzyme: Dict[str, List[int]] = {}
+) -> Dict[str, array]:
+    """Return the sorted 1-based cleavage sites of each enzyme as ``array('I')``.
+
+    This is the reference engine; the other engines must produce identical
+    results.
+    """
+    sites_by_enzyme: Dict[str, array] = {}
     length = len(seq)
+    codes = encode_sequence(seq)
 
     for enzyme_name in enzymes:
-        if enzyme_name not in rules.enzymes:
-            raise KeyError(f"Unknown enzyme: {enzyme_name}")
-        rule = rules.enzymes[enzyme_name]
-        sites = set()
-        for cut_after in range(1, length + 1):
-            if _matches_any_motif(seq, cut_after, rule.cleaves):
-                if rule.blocks and _matches_any_motif(seq, cut_after, rule.blocks):
-                    continue
-                sites.add(cut_after)
-        sites_by_enzyme[enzyme_name] = sorted(sites)
+        rule = _compiled_rule(rules, enzyme_name)
+        cleaves = [motif.checks for motif in rule.cleaves]
+        blocks = [motif.checks for motif in rule.blocks]
+        sites = array("I")
+        for anchor in range(PAD_LEFT, PAD_LEFT + length):
+            if _matches_any(codes, anchor, cleaves) and not (
+                blocks and _matches_any(codes, anchor, blocks)
+            ):
+                sites.append(anchor - PAD_LEFT + 1)
+        sites_by_enzyme[enzyme_name] = sites
 
     return sites_by_enzyme
 
 
-def _matches_any_motif(seq: str, cut_after: int, motifs: List[Motif]) -> bool:
+def scan_cleavage_sites(
+    seq: str, rules: RulesDB, enzymes: List[str]
+) -> Dict[str, array]:
+    """Single-pass variant of :func:`find_cleavage_sites`.
+
+    The sequence is walked once and every selected enzyme is evaluated at each
+    bond through a dispatch table keyed on the P1/P1' residues.
+    """
+    return _scanner(rules, enzymes).scan(seq)
+
+
+class MultiEnzymeScanner:
+    def __init__(self, rules: RulesDB, enzymes: List[str]) -> None:
+        self.enzymes = list(enzymes)
+        self._rules = [_compiled_rule(rules, name) for name in self.enzymes]
+        self._dispatch: Dict[Tuple[int, int], List[_DispatchEntry]] = {}
+
+    def scan(self, seq: str) -> Dict[str, array]:
+        codes = encode_sequence(seq)
+        sites = [array("I") for _ in self.enzymes]
+        self.scan_codes(codes, PAD_LEFT, PAD_LEFT + len(seq), sites)
+        return dict(zip(self.enzymes, sites))
+
+    def scan_codes(
+        self,
+        codes: Sequence[int],
+        start: int,
+        stop: int,
+        sites: Sequence[MutableSequence[int]],
+    ) -> None:
+        """Append the sites of residues ``codes[start:stop]`` to ``sites``.
+
+        ``sites`` holds one container per selected enzyme; positions are
+        1-based relative to ``start``.
+        """
+        dispatch = self._dispatch
+        base = start - 1
+        for anchor in range(start, stop):
+            key = (codes[anchor], codes[anchor + 1])
+            entries = dispatch.get(key)
+            if entries is None:
+                entries = self._build_entries(key)
+                dispatch[key] = entries
+            for index, cleaves, blocks in entries:
+                if _matches_any(codes, anchor, cleaves) and not (
+                    blocks and _matches_any(codes, anchor, blocks)
+                ):
+                    sites[index].append(anchor - base)
+
+    def _build_entries(self, key: Tuple[int, int]) -> List[_DispatchEntry]:
+        entries: List[_DispatchEntry] = []
+        for index, rule in enumerate(self._rules):
+            cleaves = _specialize(rule.cleaves, key)
+            if not cleaves:
+                continue
+            blocks = _specialize(rule.blocks, key)
+            if any(not checks for checks in blocks):
+                continue
+            entries.append((index, cleaves, blocks))
+        return entries
+
+
+def _scanner(rules: RulesDB, enzymes: List[str]) -> MultiEnzymeScanner:
+    key = ("scanner", tuple(enzymes))
+    scanner = rules.cache.get(key)
+    if scanner is None:
+        scanner = MultiEnzymeScanner(rules, enzymes)
+        rules.cache[key] = scanner
+    return scanner
+
+
+def _specialize(
+    motifs: Sequence[CompiledMotif], key: Tuple[int, int]
+) -> List[_Checks]:
+    # Resolve the P1/P1' checks against the known residues of ``key``; motifs
+    # that cannot match are dropped, the rest keep only their remaining checks.
+    p1, p1_prime = key
+    known = {0: p1, 1: p1_prime}
+    specialized: List[_Checks] = []
     for motif in motifs:
-        if _motif_matches(seq, cut_after, motif):
-            return True
-    return False
+        if any(
+            offset in known and not known[offset] & mask
+            for offset, mask in motif.checks
+        ):
+            continue
+        specialized.append(
+            tuple(item for item in motif.checks if item[0] not in known)
+        )
+    return specialized
+
 
+def find_cleavage_sites_numpy(
+    seq: str, rules: RulesDB, enzymes: List[str]
+) -> Dict[str, array]:
+    """Vectorized variant of :func:`find_cleavage_sites` (requires NumPy).
 
-def _motif_matches(seq: str, cut_after: int, motif: Motif) -> bool:
+    Each constraint becomes a boolean mask over all bonds via a residue lookup
+    table; sequence ends are handled by padding with a code no mask accepts.
+    """
+    np = _require_numpy()
     length = len(seq)
-    for constraint in motif.constraints:
-        idx = cut_after + constraint.offset
-        if idx < 1 or idx > length:
-            return False
-        aa = seq[idx - 1]
-        if constraint.include and aa not in constraint.include:
-            return False
-        if constraint.exclude and aa in constraint.exclude:
-            return False
-    return True
+    raw = np.frombuffer(seq.encode("latin-1", errors="replace"), dtype=np.uint8)
+    letters = raw - ord("A")
+    codes = np.full(PAD_LEFT + length + PAD_RIGHT, _NUMPY_PAD_CODE, dtype=np.uint8)
+    codes[PAD_LEFT : PAD_LEFT + length] = np.where(
+        letters < 26, letters, _NUMPY_OTHER_CODE
+    )
+
+    sites_by_enzyme: Dict[str, array] = {}
+    for enzyme_name in enzymes:
+        cleaves, blocks = _numpy_tables(rules, enzyme_name)
+        hits = _numpy_match_any(np, codes, length, cleaves)
+        if blocks:
+            hits &= ~_numpy_match_any(np, codes, length, blocks)
+        sites = array("I")
+        sites.frombytes((np.flatnonzero(hits) + 1).astype(np.uintc).tobytes())
+        sites_by_enzyme[enzyme_name] = sites
+    return sites_by_enzyme
+
+
+def find_cleavage_sites_regex(
+    seq: str, rules: RulesDB, enzymes: List[str]
+) -> Dict[str, array]:
+    """Regex variant of :func:`find_cleavage_sites`.
+
+    Uses one ``finditer`` per enzyme over the compiled bond pattern returned
+    by :meth:`RulesDB.pattern`, so the scan itself runs in the regex engine.
+    """
+    sites_by_enzyme: Dict[str, array] = {}
+    for enzyme_name in enzymes:
+        pattern = rules.pattern(enzyme_name)
+        sites_by_enzyme[enzyme_name] = array(
+            "I", [match.start() for match in pattern.finditer(seq, 1)]
+        )
+    return sites_by_enzyme
+
+
+def find_cleavage_sites_indexed(
+    seq: str,
+    rules: RulesDB,
+    enzymes: List[str],
+    index: Dict[str, List[int]] | None = None,
+) -> Dict[str, array]:
+    """Candidate-driven variant of :func:`find_cleavage_sites`.
+
+    Each motif is only evaluated at bonds where its most selective constraint
+    can match according to the residue index of ``seq``; enzymes without any
+    candidate bond are skipped without touching the sequence.
+    """
+    length = len(seq)
+    if index is None:
+        index = build_residue_index(seq)
+    bits = {aa: residue_bit(aa) for aa in index}
+    codes: List[int] | None = None
+
+    sites_by_enzyme: Dict[str, array] = {}
+    for enzyme_name in enzymes:
+        rule = _compiled_rule(rules, enzyme_name)
+        candidates = set()
+        for motif in rule.cleaves:
+            candidates.update(_motif_candidates(motif.checks, index, bits, length))
+        if not candidates:
+            sites_by_enzyme[enzyme_name] = array("I")
+            continue
+        if codes is None:
+            codes = encode_sequence(seq)
+        cleaves = [motif.checks for motif in rule.cleaves]
+        blocks = [motif.checks for motif in rule.blocks]
+        sites_by_enzyme[enzyme_name] = array(
+            "I",
+            [
+                cut_after
+                for cut_after in sorted(candidates)
+                if _matches_any(codes, cut_after - 1 + PAD_LEFT, cleaves)
+                and not (
+                    blocks and _matches_any(codes, cut_after - 1 + PAD_LEFT, blocks)
+                )
+            ],
+        )
+    return sites_by_enzyme
+
+
+def build_residue_index(seq: str) -> Dict[str, List[int]]:
+    """Map every residue of ``seq`` to its sorted 1-based positions."""
+    return {
+        aa: [match.start() + 1 for match in re.finditer(re.escape(aa), seq)]
+        for aa in set(seq)
+    }
+
+
+ENGINES = {
+    "reference": find_cleavage_sites,
+    "scan": scan_cleavage_sites,
+    "numpy": find_cleavage_sites_numpy,
+    "regex": find_cleavage_sites_regex,
+    "indexed": find_cleavage_sites_indexed,
+}
+
+_NUMPY_OTHER_CODE = 26
+_NUMPY_PAD_CODE = 27
+
+
+def _require_numpy():
+    try:
+        import numpy
+    except ImportError as exc:
+        raise ValueError(
+            "The numpy engine requires NumPy. Install it with "
+            "'pip install peptide-cutter[numpy]'."
+        ) from exc
+    return numpy
+
+
+def _numpy_tables(rules: RulesDB, enzyme_name: str):
+    key = ("numpy", enzyme_name)
+    tables = rules.cache.get(key)
+    if tables is None:
+        np = _require_numpy()
+        rule = _compiled_rule(rules, enzyme_name)
+        bits = np.arange(_NUMPY_PAD_CODE + 1, dtype=np.int64)
+
+        def motif_tables(motifs):
+            return [
+                [
+                    (offset, ((mask >> bits) & 1).astype(bool))
+                    for offset, mask in motif.checks
+                ]
+                for motif in motifs
+            ]
+
+        tables = (motif_tables(rule.cleaves), motif_tables(rule.blocks))
+        rules.cache[key] = tables
+    return tables
+
+
+def _numpy_match_any(np, codes, length: int, motifs):
+    matched = np.zeros(length, dtype=bool)
+    for checks in motifs:
+        hits = np.ones(length, dtype=bool)
+        for offset, table in checks:
+            start = PAD_LEFT + offset
+            hits &= table[codes[start : start + length]]
+        matched |= hits
+    return matched
+
+
+@dataclass(frozen=True)
+class BatchSites:
+    """Cleavage sites of many records in CSR layout.
+
+    For every enzyme, ``positions[name]`` concatenates the sorted 1-based sites
+    of all records and ``offsets[name][i]:offsets[name][i + 1]`` delimits the
+    slice belonging to record ``i``.
+    """
+
+    enzymes: List[str]
+    offsets: Dict[str, array]
+    positions: Dict[str, array]
+
+    def __len__(self) -> int:
+        if not self.enzymes:
+            return 0
+        return len(self.offsets[self.enzymes[0]]) - 1
+
+    def record(self, index: int) -> Dict[str, memoryview]:
+        """Return the sites of one record as zero-copy views of the packed
+        arrays; copy them (e.g. with :func:`build_summary`) to keep them
+        beyond the batch or to pickle them."""
+        sites_by_enzyme: Dict[str, memoryview] = {}
+        for name in self.enzymes:
+            offsets = self.offsets[name]
+            sites_by_enzyme[name] = memoryview(self.positions[name])[
+                offsets[index] : offsets[index + 1]
+            ]
+        return sites_by_enzyme
+
+
+def find_cleavage_sites_batch(
+    seqs: Iterable[str],
+    rules: RulesDB,
+    enzymes: List[str],
+    engine: str = "scan",
+) -> BatchSites:
+    """Find cleavage sites for many sequences in one call.
+
+    With the default ``scan`` engine all sequences are encoded into a single
+    code buffer, separated by zero padding so that no motif can match across
+    records, and scanned without per-record setup. Other engines are called
+    per sequence and packed into the same layout.
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine: {engine}")
+    names = list(enzymes)
+    positions = [array("I") for _ in names]
+    offsets = [array("I", [0]) for _ in names]
+
+    def close_record() -> None:
+        for sites, ends in zip(positions, offsets):
+            ends.append(len(sites))
+
+    if engine == "scan":
+        scanner = _scanner(rules, names)
+        codes: List[int] = []
+        bounds: List[Tuple[int, int]] = []
+        for seq in seqs:
+            start = len(codes) + PAD_LEFT
+            codes.extend(encode_sequence(seq))
+            bounds.append((start, start + len(seq)))
+        for start, stop in bounds:
+            scanner.scan_codes(codes, start, stop, positions)
+            close_record()
+    else:
+        find_sites = ENGINES[engine]
+        for seq in seqs:
+            sites_by_enzyme = find_sites(seq, rules, names)
+            for sites, name in zip(positions, names):
+                sites.extend(sites_by_enzyme[name])
+            close_record()
+
+    return BatchSites(
+        enzymes=names,
+        offsets=dict(zip(names, offsets)),
+        positions=dict(zip(names, positions)),
+    )
+
+
+def _motif_candidates(
+    checks: _Checks,
+    index: Dict[str, List[int]],
+    bits: Dict[str, int],
+    length: int,
+) -> Iterable[int]:
+    if not checks:
+        return range(1, length + 1)
+    best_offset, best_allowed, best_count = 0, [], -1
+    for offset, mask in checks:
+        allowed = [aa for aa, bit in bits.items() if bit & mask]
+        count = sum(len(index[aa]) for aa in allowed)
+        if not count:
+            return ()
+        if best_count < 0 or count < best_count:
+            best_offset, best_allowed, best_count = offset, allowed, count
+    return [
+        pos - best_offset
+        for aa in best_allowed
+        for pos in index[aa]
+        if 1 <= pos - best_offset <= length
+    ]
+
+
+def _compiled_rule(rules: RulesDB, enzyme_name: str) -> CompiledRule:
+    if enzyme_name not in rules.enzymes:
+        raise KeyError(f"Unknown enzyme: {enzyme_name}")
+    compiled = rules.compiled.get(enzyme_name)
+    if compiled is None:
+        compiled = compile_rule(rules.enzymes[enzyme_name])
+    return compiled
+
+
+def _matches_any(
+    codes: Sequence[int], anchor: int, motifs: Sequence[Sequence[Tuple[int, int]]]
+) -> bool:
+    # ``anchor`` is the index of P1 in the padded code array; every check is a
+    # single AND of the residue bit against the allowed-residue mask.
+    for checks in motifs:
+        for offset, mask in checks:
+            if not codes[anchor + offset] & mask:
+                break
+        else:
+            return True
+    return False
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import mmap
+import os
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+from .sequence import iter_fasta_records
+
+INDEX_SUFFIX = ".pcidx"
+INDEX_MAGIC = "#peptide-cutter-fasta-index"
+INDEX_VERSION = "1"
+
+FastaIndex = Dict[str, List[Tuple[int, int]]]
+
+
+def index_path_for(fasta_path: str) -> Path:
+    return Path(f"{fasta_path}{INDEX_SUFFIX}")
+
+
+def build_fasta_index(fasta_path: str) -> FastaIndex:
+    """Map each accession to the ``(offset, length)`` byte spans of its records.
+
+    An accession maps to several spans when it occurs more than once. Spans
+    cover the header line and every sequence line up to the next header.
+    """
+    index: FastaIndex = {}
+    current: str | None = None
+    start = 0
+    offset = 0
+    with open(fasta_path, "rb") as f:
+        for line in f:
+            if line.lstrip().startswith(b">"):
+                if current is not None:
+                    index.setdefault(current, []).append((start, offset - start))
+                current = _header_accession(line)
+                start = offset
+            offset += len(line)
+    if current is not None:
+        index.setdefault(current, []).append((start, offset - start))
+    return index
+
+
+def load_fasta_index(fasta_path: str) -> FastaIndex:
+    """Return the index of ``fasta_path``, rebuilding the sidecar when stale.
+
+    The sidecar ``<fasta>.pcidx`` records the FASTA size and mtime; when they
+    no longer match, or the sidecar is missing or unreadable, the index is
+    rebuilt and written again (best effort).
+    """
+    stat = os.stat(fasta_path)
+    stamp = [INDEX_MAGIC, INDEX_VERSION, str(stat.st_size), str(stat.st_mtime_ns)]
+    sidecar = index_path_for(fasta_path)
+
+    try:
+        with open(sidecar, "r", encoding="utf-8") as f:
+            if f.readline().rstrip("\n").split("\t") == stamp:
+                return _read_index_lines(f)
+    except (OSError, ValueError):
+        pass
+
+    index = build_fasta_index(fasta_path)
+    try:
+        tmp_path = sidecar.with_name(f"{sidecar.name}.{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write("\t".join(stamp) + "\n")
+            for accession, spans in index.items():
+                for offset, length in spans:
+                    f.write(f"{accession}\t{offset}\t{length}\n")
+        os.replace(tmp_path, sidecar)
+    except OSError:
+        pass
+    return index
+
+
+def read_fasta_records(
+    fasta_path: str, ids: Iterable[str]
+) -> Iterator[Tuple[str, str, str]]:
+    """Yield only the records whose accession is in ``ids``, in file order.
+
+    Records are sliced out of a memory map of the FASTA using the index, so
+    the rest of the file is never parsed.
+    """
+    wanted = list(dict.fromkeys(ids))
+    index = load_fasta_index(fasta_path)
+    missing = [accession for accession in wanted if accession not in index]
+    if missing:
+        raise ValueError("Accession(s) not found in FASTA: " + ", ".join(missing))
+
+    spans = sorted(span for accession in wanted for span in index[accession])
+    if not spans:
+        return
+    with open(fasta_path, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            for offset, length in spans:
+                text = data[offset : offset + length].decode("utf-8")
+                yield from iter_fasta_records(text.splitlines())
+
+
+def _header_accession(line: bytes) -> str:
+    header = line.strip()[1:].decode("utf-8").strip()
+    if not header:
+        return "User_Sequence"
+    return header.split(None, 1)[0] or "User_Sequence"
+
+
+def _read_index_lines(lines: Iterable[str]) -> FastaIndex:
+    index: FastaIndex = {}
+    for line in lines:
+        accession, offset, length = line.rstrip("\n").split("\t")
+        index.setdefault(accession, []).append((int(offset), int(length)))
+    return index
@@ -0,0 +1,228 @@
+from __future__ import annotations
+
+import csv
+import math
+from array import array
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Mapping
+
+# Residue masses (peptide-bond form, i.e. without water) in Daltons.
+MONOISOTOPIC_MASSES: Dict[str, float] = {
+    "A": 71.03711,
+    "R": 156.10111,
+    "N": 114.04293,
+    "D": 115.02694,
+    "C": 103.00919,
+    "E": 129.04259,
+    "Q": 128.05858,
+    "G": 57.02146,
+    "H": 137.05891,
+    "I": 113.08406,
+    "L": 113.08406,
+    "K": 128.09496,
+    "M": 131.04049,
+    "F": 147.06841,
+    "P": 97.05276,
+    "S": 87.03203,
+    "T": 101.04768,
+    "W": 186.07931,
+    "Y": 163.06333,
+    "V": 99.06841,
+    "U": 150.95364,
+    "O": 237.14773,
+}
+AVERAGE_MASSES: Dict[str, float] = {
+    "A": 71.0788,
+    "R": 156.1875,
+    "N": 114.1038,
+    "D": 115.0886,
+    "C": 103.1388,
+    "E": 129.1155,
+    "Q": 128.1307,
+    "G": 57.0519,
+    "H": 137.1411,
+    "I": 113.1594,
+    "L": 113.1594,
+    "K": 128.1741,
+    "M": 131.1926,
+    "F": 147.1766,
+    "P": 97.1167,
+    "S": 87.0782,
+    "T": 101.1051,
+    "W": 186.2132,
+    "Y": 163.1760,
+    "V": 99.1326,
+    "U": 150.0388,
+    "O": 237.3018,
+}
+MASS_TABLES: Dict[str, Dict[str, float]] = {
+    "monoisotopic": MONOISOTOPIC_MASSES,
+    "average": AVERAGE_MASSES,
+}
+WATER_MASSES: Dict[str, float] = {
+    "monoisotopic": 18.01056,
+    "average": 18.01528,
+}
+
+FRAGMENT_CSV_HEADER = [
+    "Start",
+    "End",
+    "Missed cleavages",
+    "Length",
+    "Mass",
+    "Sequence",
+]
+
+
+@dataclass(frozen=True)
+class Fragment:
+    """One digestion product; ``start``/``end`` are 1-based and inclusive.
+
+    ``mass`` is the peptide mass including water, or NaN when the fragment
+    contains a residue without a defined mass (e.g. B, Z or X).
+    """
+
+    start: int
+    end: int
+    missed_cleavages: int
+    sequence: str
+    mass: float
+
+    def __len__(self) -> int:
+        return self.end - self.start + 1
+
+
+def prefix_masses(seq: str, mass_type: str = "monoisotopic") -> array:
+    """Return ``m`` with ``m[i]`` the summed residue mass of ``seq[:i]``.
+
+    Residues without a defined mass contribute 0; see :func:`unknown_counts`.
+    """
+    table = _mass_table(mass_type)
+    masses = array("d", [0.0])
+    total = 0.0
+    for aa in seq:
+        total += table.get(aa, 0.0)
+        masses.append(total)
+    return masses
+
+
+def unknown_counts(seq: str, mass_type: str = "monoisotopic") -> array:
+    """Return ``u`` with ``u[i]`` the number of massless residues in ``seq[:i]``."""
+    table = _mass_table(mass_type)
+    counts = array("I", [0])
+    total = 0
+    for aa in seq:
+        if aa not in table:
+            total += 1
+        counts.append(total)
+    return counts
+
+
+def cleavage_boundaries(
+    length: int, sites_by_enzyme: Mapping[str, Iterable[int]]
+) -> List[int]:
+    """Merge the sites of all enzymes into sorted 0-based fragment boundaries.
+
+    A site ``p`` cuts after residue ``p``; the result always starts with 0 and
+    ends with ``length``.
+    """
+    cuts = set()
+    for sites in sites_by_enzyme.values():
+        cuts.update(sites)
+    inner = sorted(p for p in cuts if 0 < p < length)
+    return [0] + inner + [length]
+
+
+def iter_fragments(
+    seq: str,
+    sites_by_enzyme: Mapping[str, Iterable[int]],
+    missed_cleavages: int = 0,
+    min_length: int = 1,
+    max_length: int | None = None,
+    min_mass: float | None = None,
+    max_mass: float | None = None,
+    mass_type: str = "monoisotopic",
+) -> Iterator[Fragment]:
+    """Yield the peptides of a digest by all enzymes in ``sites_by_enzyme``.
+
+    ``sites_by_enzyme`` is the output of :func:`find_cleavage_sites`. Peptides
+    spanning up to ``missed_cleavages`` uncut sites are included, ordered by
+    start and then end position. Masses are differences of a prefix-sum
+    array, so each peptide costs O(1) regardless of its length, and the
+    enumeration of an end position stops as soon as the length or mass
+    bound is exceeded. Only O(len(seq)) memory is held.
+    """
+    if missed_cleavages < 0:
+        raise ValueError("missed_cleavages must be 0 or positive.")
+    masses = prefix_masses(seq, mass_type)
+    water = WATER_MASSES[mass_type]
+    unknown = unknown_counts(seq, mass_type)
+    bounds = cleavage_boundaries(len(seq), sites_by_enzyme)
+    last = len(bounds) - 1
+
+    for i in range(last):
+        start = bounds[i]
+        for j in range(i + 1, min(i + missed_cleavages + 1, last) + 1):
+            end = bounds[j]
+            length = end - start
+            if max_length is not None and length > max_length:
+                break
+            # Massless residues only make the known part a lower bound, so
+            # the upper mass bound still ends the scan for this start.
+            mass = masses[end] - masses[start] + water
+            if max_mass is not None and mass > max_mass:
+                break
+            if length < min_length:
+                continue
+            if unknown[end] != unknown[start]:
+                if min_mass is not None or max_mass is not None:
+                    continue
+                mass = math.nan
+            elif min_mass is not None and mass < min_mass:
+                continue
+            yield Fragment(start + 1, end, j - i - 1, seq[start:end], mass)
+
+
+def write_fragments_csv(
+    path: str,
+    fragments: Iterable[Fragment],
+    chain_id: str | None = None,
+    include_header: bool = True,
+) -> int:
+    """Stream ``fragments`` to a CSV file and return the number written."""
+    out_path = Path(path)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    header = FRAGMENT_CSV_HEADER
+    if chain_id is not None:
+        header = ["Chain ID"] + header
+    count = 0
+    with open(out_path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f, lineterminator="\n")
+        if include_header:
+            writer.writerow(header)
+        for fragment in fragments:
+            mass = "" if math.isnan(fragment.mass) else f"{fragment.mass:.5f}"
+            record = [
+                fragment.start,
+                fragment.end,
+                fragment.missed_cleavages,
+                len(fragment),
+                mass,
+                fragment.sequence,
+            ]
+            if chain_id is not None:
+                record = [chain_id] + record
+            writer.writerow(record)
+            count += 1
+    return count
+
+
+def _mass_table(mass_type: str) -> Dict[str, float]:
+    try:
+        return MASS_TABLES[mass_type]
+    except KeyError:
+        choices = ", ".join(sorted(MASS_TABLES))
+        raise ValueError(
+            f"Unknown mass type: {mass_type} (choose from {choices})"
+        ) from None
@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Dict, Iterable, List
+
+MANIFEST_NAME = "manifest.jsonl"
+MANIFEST_VERSION = 1
+
+
+def sha256_text(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def sha256_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def record_fingerprint(
+    seq: str,
+    rules_hash: str,
+    enzymes: List[str],
+    line_width: int,
+    fragments: dict | None = None,
+    stages: List[str] | None = None,
+    stylesheet: str | None = None,
+    intermediates: bool = False,
+) -> dict:
+    """Inputs a record's outputs depend on; a changed value invalidates them."""
+    fingerprint = {
+        "version": MANIFEST_VERSION,
+        "seq_sha256": sha256_text(seq),
+        "rules_sha256": rules_hash,
+        "enzymes": list(enzymes),
+        "line_width": line_width,
+    }
+    if fragments is not None:
+        fingerprint["fragments"] = fragments
+    if stages is not None:
+        fingerprint["stages"] = list(stages)
+    if stylesheet is not None:
+        fingerprint["stylesheet"] = stylesheet
+    if intermediates:
+        fingerprint["intermediates"] = True
+    return fingerprint
+
+
+def entry_is_current(
+    entry: dict | None, fingerprint: dict, results_dir: Path
+) -> bool:
+    if entry is None:
+        return False
+    if any(entry.get(key) != value for key, value in fingerprint.items()):
+        return False
+    # Reports linking a stylesheet do not stand in for self-contained ones.
+    if "stylesheet" in entry and "stylesheet" not in fingerprint:
+        return False
+    outputs = list(entry.get("outputs", []))
+    # The tmp/ files only count when this run wants them; they may have been
+    # removed since, e.g. by --cleanup-tmp.
+    if fingerprint.get("intermediates"):
+        outputs.extend(entry.get("tmp_outputs", []))
+    return all((results_dir / output).exists() for output in outputs)
+
+
+class RunManifest:
+    """Per-record manifest of a results directory.
+
+    Each line of ``manifest.jsonl`` describes one finished record: the inputs
+    its outputs depend on (sequence hash, rules hash, enzyme selection, line
+    width), the files written for it and its cleavage sites, from which the
+    merged outputs are rebuilt without running the engine again. Lines are
+    appended and flushed as records finish, so the manifest survives a crash;
+    :meth:`finalize` rewrites it compactly in input order at the end of a run.
+    """
+
+    def __init__(self, results_dir: Path, resume: bool) -> None:
+        self.path = results_dir / MANIFEST_NAME
+        self.results_dir = results_dir
+        # Entries of the run being resumed are indexed by line offset and
+        # parsed one at a time by :meth:`previous_entry`.
+        self._previous: Dict[str, tuple[int, int]] = {}
+        self._reader = None
+        if resume and self.path.exists():
+            self._reader = open(self.path, "rb")
+            self._previous = _index_entries(self._reader)
+        self._handle = open(self.path, "a" if resume else "w", encoding="utf-8")
+        if resume and self._handle.tell() and not self._ends_with_newline():
+            self._handle.write("\n")
+
+    def append(self, entry: dict) -> None:
+        self._handle.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self._handle.flush()
+
+    def previous_entry(self, safe_id: str) -> dict | None:
+        """Return the entry of ``safe_id`` from the run being resumed, once."""
+        span = self._previous.pop(safe_id, None)
+        if span is None:
+            return None
+        self._reader.seek(span[0])
+        return json.loads(self._reader.read(span[1]))
+
+    def finalize(self, safe_ids: Iterable[str]) -> None:
+        """Rewrite the manifest with the latest entry of each record, in order."""
+        self.close()
+        # Only line offsets are kept in memory; the entries are copied over.
+        with open(self.path, "rb") as src:
+            latest = _index_entries(src)
+            tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+            with open(tmp_path, "wb") as f:
+                for safe_id in safe_ids:
+                    span = latest.get(safe_id)
+                    if span is None:
+                        continue
+                    src.seek(span[0])
+                    line = src.read(span[1])
+                    f.write(line if line.endswith(b"\n") else line + b"\n")
+        os.replace(tmp_path, self.path)
+
+    def close(self) -> None:
+        self._previous = {}
+        if self._reader is not None:
+            self._reader.close()
+        if not self._handle.closed:
+            self._handle.close()
+
+    def _ends_with_newline(self) -> bool:
+        with open(self.path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b"\n"
+
+
+def _index_entries(f) -> Dict[str, tuple[int, int]]:
+    """Map the safe ID of each entry in ``f`` to the span of its latest line."""
+    spans: Dict[str, tuple[int, int]] = {}
+    offset = 0
+    for line in f:
+        # A run killed mid-write can leave a truncated last line.
+        safe_id = _entry_safe_id(line)
+        if safe_id is not None:
+            spans[safe_id] = (offset, len(line))
+        offset += len(line)
+    return spans
+
+
+def _entry_safe_id(line: bytes) -> str | None:
+    try:
+        entry = json.loads(line)
+    except ValueError:
+        return None
+    if isinstance(entry, dict) and "safe_id" in entry:
+        return entry["safe_id"]
+    return None
@@ -0,0 +1,315 @@
+from __future__ import annotations
+
+import heapq
+import mmap
+import os
+import shutil
+import struct
+import tempfile
+from array import array
+from contextlib import ExitStack
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Tuple
+
+from .binfile import assemble_sections, write_uint
+from .engine import find_cleavage_sites_batch
+from .fragments import iter_fragments
+from .pool import run_ordered
+from .rules import RulesDB
+from .sequence import validate_sequence
+
+INDEX_MAGIC = b"PCPEPIX1"
+# magic, peptide/posting/protein counts, then the byte offsets of the
+# peptide offsets, peptide blob, posting offsets, postings, protein offsets
+# and protein blob sections. All integers are little-endian.
+_HEADER = struct.Struct("<8s9Q")
+_OFFSET = struct.Struct("<Q")
+_POSTING = struct.Struct("<II")
+
+INDEX_CHUNK_SIZE = 64
+MERGE_FAN_IN = 64
+
+
+@dataclass(frozen=True)
+class PeptideHit:
+    """One occurrence of a peptide; ``start``/``end`` are 1-based, inclusive."""
+
+    protein: str
+    start: int
+    end: int
+
+
+class PeptideIndex:
+    """Read-only view of a peptide index file.
+
+    The file is memory-mapped; peptides are stored sorted, so :meth:`lookup`
+    is a binary search touching O(log n) peptides and nothing is loaded up
+    front.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._data) < _HEADER.size:
+            self._data.close()
+            raise ValueError(f"Not a peptide index file: {path}")
+        fields = _HEADER.unpack_from(self._data, 0)
+        if fields[0] != INDEX_MAGIC:
+            self._data.close()
+            raise ValueError(f"Not a peptide index file: {path}")
+        self.peptide_count, self.posting_count, self.protein_count = fields[1:4]
+        (
+            self._peptide_offsets,
+            self._peptide_blob,
+            self._posting_offsets,
+            self._postings,
+            self._protein_offsets,
+            self._protein_blob,
+        ) = fields[4:]
+
+    def __len__(self) -> int:
+        return self.peptide_count
+
+    def __contains__(self, peptide: str) -> bool:
+        return self._find(_peptide_key(peptide)) >= 0
+
+    def __enter__(self) -> "PeptideIndex":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._data.close()
+
+    def peptide(self, index: int) -> str:
+        return self._peptide_bytes(index).decode("ascii")
+
+    def protein(self, index: int) -> str:
+        start = self._protein_blob + self._offset(self._protein_offsets, index)
+        end = self._protein_blob + self._offset(self._protein_offsets, index + 1)
+        return self._data[start:end].decode("utf-8")
+
+    def lookup(self, peptide: str) -> List[PeptideHit]:
+        """Return every protein position producing ``peptide`` (empty if none)."""
+        key = _peptide_key(peptide)
+        index = self._find(key)
+        if index < 0:
+            return []
+        first = self._offset(self._posting_offsets, index)
+        last = self._offset(self._posting_offsets, index + 1)
+        hits: List[PeptideHit] = []
+        for posting in range(first, last):
+            protein, start = _POSTING.unpack_from(
+                self._data, self._postings + posting * _POSTING.size
+            )
+            hits.append(PeptideHit(self.protein(protein), start, start + len(key) - 1))
+        return hits
+
+    def _find(self, key: bytes) -> int:
+        lo, hi = 0, self.peptide_count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._peptide_bytes(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self.peptide_count and self._peptide_bytes(lo) == key:
+            return lo
+        return -1
+
+    def _peptide_bytes(self, index: int) -> bytes:
+        start = self._peptide_blob + self._offset(self._peptide_offsets, index)
+        end = self._peptide_blob + self._offset(self._peptide_offsets, index + 1)
+        return self._data[start:end]
+
+    def _offset(self, section: int, index: int) -> int:
+        return _OFFSET.unpack_from(self._data, section + index * _OFFSET.size)[0]
+
+
+def build_peptide_index(
+    records: Iterable[Tuple[str, str, str]],
+    out_path: str,
+    rules: RulesDB,
+    enzymes: List[str],
+    fragment_options: Dict | None = None,
+    engine: str = "scan",
+    jobs: int = 1,
+) -> Tuple[int, int, int]:
+    """Digest ``records`` and write a peptide → protein index to ``out_path``.
+
+    ``records`` are ``(accession, description, sequence)`` tuples as yielded by
+    :func:`iter_fasta_records`; ``fragment_options`` are keyword arguments of
+    :func:`iter_fragments`. Chunks of records are digested on the process
+    pool, each into a sorted run file; the runs are then merged in bounded
+    memory and written out section by section. Returns the numbers of
+    peptides, postings and proteins.
+    """
+    target = Path(out_path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    work_dir = Path(tempfile.mkdtemp(prefix=".pcpi-", dir=target.parent))
+    settings = {
+        "rules": rules,
+        "enzymes": list(enzymes),
+        "engine": engine,
+        "fragments": dict(fragment_options or {}),
+        "work_dir": work_dir,
+    }
+    try:
+        with open(work_dir / "protein_offsets", "wb") as protein_offsets, open(
+            work_dir / "protein_blob", "wb"
+        ) as protein_blob:
+            chunks = _protein_chunks(records, protein_offsets, protein_blob)
+            runs = [
+                run
+                for run in run_ordered(
+                    chunks, _digest_chunk, jobs, _init_index_worker, (settings,)
+                )
+                if run is not None
+            ]
+        return _write_index(_merge_runs(runs, work_dir), work_dir, target)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def _protein_chunks(
+    records: Iterable[Tuple[str, str, str]],
+    offsets: BinaryIO,
+    blob: BinaryIO,
+) -> Iterator[List[Tuple[int, str]]]:
+    """Validate records, number them and stream their ids to the protein table."""
+    write_uint(offsets, "Q", [0])
+    chunk: List[Tuple[int, str]] = []
+    for protein, (accession, _description, raw_seq) in enumerate(records):
+        seq, _meta = validate_sequence(raw_seq, strict=True)
+        if not seq:
+            raise ValueError(f"Empty sequence for record: {accession}")
+        blob.write(accession.encode("utf-8"))
+        write_uint(offsets, "Q", [blob.tell()])
+        chunk.append((protein, seq))
+        if len(chunk) >= INDEX_CHUNK_SIZE:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+_INDEX_SETTINGS: dict = {}
+
+
+def _init_index_worker(settings: dict) -> None:
+    _INDEX_SETTINGS.clear()
+    _INDEX_SETTINGS.update(settings)
+
+
+def _digest_chunk(chunk: List[Tuple[int, str]]) -> str | None:
+    """Digest one chunk and write its sorted ``peptide, protein, start`` run."""
+    seqs = [seq for _, seq in chunk]
+    batch = find_cleavage_sites_batch(
+        seqs,
+        _INDEX_SETTINGS["rules"],
+        _INDEX_SETTINGS["enzymes"],
+        engine=_INDEX_SETTINGS["engine"],
+    )
+    entries: List[Tuple[str, int, int]] = []
+    for index, (protein, seq) in enumerate(chunk):
+        for fragment in iter_fragments(
+            seq, batch.record(index), **_INDEX_SETTINGS["fragments"]
+        ):
+            entries.append((fragment.sequence, protein, fragment.start))
+    if not entries:
+        return None
+    entries.sort()
+    path = _INDEX_SETTINGS["work_dir"] / f"run-{chunk[0][0]:010d}"
+    with open(path, "w", encoding="ascii") as f:
+        f.writelines(_run_line(*entry) for entry in entries)
+    return str(path)
+
+
+def _run_line(peptide: str, protein: int, start: int) -> str:
+    # Zero padding makes the plain string order of run lines match the order
+    # of (peptide, protein, start); "\t" sorts before every residue letter.
+    return f"{peptide}\t{protein:010d}\t{start:010d}\n"
+
+
+def _merge_runs(runs: List[str], work_dir: Path) -> Iterator[str]:
+    """Merge sorted run files, at most ``MERGE_FAN_IN`` open at a time."""
+    generation = 0
+    while len(runs) > MERGE_FAN_IN:
+        merged: List[str] = []
+        for group in range(0, len(runs), MERGE_FAN_IN):
+            path = work_dir / f"merge-{generation}-{group // MERGE_FAN_IN}"
+            with open(path, "w", encoding="ascii") as out:
+                out.writelines(_merge_files(runs[group : group + MERGE_FAN_IN]))
+            merged.append(str(path))
+            for run in runs[group : group + MERGE_FAN_IN]:
+                os.remove(run)
+        runs = merged
+        generation += 1
+    return _merge_files(runs)
+
+
+def _merge_files(paths: List[str]) -> Iterator[str]:
+    with ExitStack() as stack:
+        files = [stack.enter_context(open(path, encoding="ascii")) for path in paths]
+        yield from heapq.merge(*files)
+
+
+def _write_index(
+    lines: Iterable[str], work_dir: Path, target: Path
+) -> Tuple[int, int, int]:
+    """Group merged run lines by peptide and assemble the index file."""
+    names = ("peptide_offsets", "peptide_blob", "posting_offsets", "postings")
+    with ExitStack() as stack:
+        peptide_offsets, peptide_blob, posting_offsets, postings = (
+            stack.enter_context(open(work_dir / name, "wb")) for name in names
+        )
+        write_uint(peptide_offsets, "Q", [0])
+        write_uint(posting_offsets, "Q", [0])
+        peptide_count = 0
+        posting_count = 0
+        previous = None
+        pending = array("I")
+        for line in lines:
+            peptide, protein, start = line.rstrip("\n").split("\t")
+            if peptide != previous:
+                if previous is not None:
+                    write_uint(posting_offsets, "Q", [posting_count])
+                previous = peptide
+                peptide_blob.write(peptide.encode("ascii"))
+                write_uint(peptide_offsets, "Q", [peptide_blob.tell()])
+                peptide_count += 1
+            pending.append(int(protein))
+            pending.append(int(start))
+            posting_count += 1
+            if len(pending) >= 1 << 16:
+                write_uint(postings, "I", pending)
+                pending = array("I")
+        write_uint(postings, "I", pending)
+        if previous is not None:
+            write_uint(posting_offsets, "Q", [posting_count])
+
+    sections = [
+        "peptide_offsets",
+        "peptide_blob",
+        "posting_offsets",
+        "postings",
+        "protein_offsets",
+        "protein_blob",
+    ]
+    protein_count = (work_dir / "protein_offsets").stat().st_size // 8 - 1
+    assemble_sections(
+        target,
+        _HEADER.size,
+        lambda offsets: _HEADER.pack(
+            INDEX_MAGIC, peptide_count, posting_count, protein_count, *offsets
+        ),
+        [work_dir / name for name in sections],
+    )
+    return peptide_count, posting_count, protein_count
+
+
+def _peptide_key(peptide: str) -> bytes:
+    return peptide.strip().upper().encode("ascii", "replace")
@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import os
+from typing import Callable, Iterable, Iterator, TypeVar
+
+Chunk = TypeVar("Chunk")
+Result = TypeVar("Result")
+
+
+def resolve_jobs(jobs: int) -> int:
+    if jobs < 0:
+        raise ValueError("--jobs must be 0 (all CPUs) or a positive number.")
+    if jobs == 0:
+        return os.cpu_count() or 1
+    return jobs
+
+
+def run_ordered(
+    chunks: Iterable[Chunk],
+    process: Callable[[Chunk], Result],
+    jobs: int,
+    initializer: Callable[..., None],
+    initargs: tuple = (),
+) -> Iterator[Result]:
+    """Apply ``process`` to each chunk inline or on a process pool, in order.
+
+    ``initializer(*initargs)`` sets up per-process state; with ``jobs == 1``
+    it runs in the calling process. At most ``2 * jobs`` chunks are in flight,
+    so a lazy ``chunks`` iterable is consumed only as results are taken.
+    """
+    if jobs == 1:
+        initializer(*initargs)
+        for chunk in chunks:
+            yield process(chunk)
+        return
+
+    from collections import deque
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(
+        max_workers=jobs, initializer=initializer, initargs=initargs
+    ) as pool:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(process, chunk))
+            if len(pending) >= jobs * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
@@ -7,8 +7,16 @@ from typing import Dict, List
 
 
 def render_result_parts(
-    seq: str, meta: Dict, selected: List[str], summary: Dict, line_width: int
+    seq: str,
+    meta: Dict,
+    selected: List[str],
+    summary: Dict,
+    line_width: int,
+    sequence_display: str | None = None,
 ) -> List[str]:
+    if sequence_display is None:
+        sequence_display = render_sequence_display(seq, line_width)
+
     part1: List[str] = []
     part1.append("Input sequence display")
 
@@ -16,7 +24,7 @@ def render_result_parts(
     part1.append(f"Accession: {accession}")
     part1.append(f"The sequence is {len(seq)} amino acids long.")
     part1.append("```")
-    part1.append(_render_sequence_display(seq, line_width))
+    part1.append(sequence_display)
     part1.append("```")
     part1.append(f"The sequence is {len(seq)} amino acids long.")
 
@@ -43,7 +51,7 @@ def render_result_parts(
     for row in summary["table_rows"]:
         if row["count"] == 0:
             continue
-        positions = ", ".join(str(p) for p in row["sites"]) if row["sites"] else "-"
+        positions = ", ".join(map(str, row["sites"])) if row["sites"] else "-"
         part3.append(f"| {row['name']} | {row['count']} | {positions} |")
 
     part3.append("")
@@ -82,7 +90,7 @@ def render_part3_csv(
     for row in summary["table_rows"]:
         if row["count"] == 0:
             continue
-        positions = ", ".join(str(p) for p in row["sites"]) if row["sites"] else "-"
+        positions = ", ".join(map(str, row["sites"])) if row["sites"] else "-"
         name = _clean_csv_enzyme_name(row["name"])
         record = [name, row["count"], positions]
         if chain_id is not None:
@@ -131,7 +139,7 @@ def _has_proline_endopeptidase(names: List[str]) -> bool:
     return False
 
 
-def _render_sequence_display(seq: str, width: int) -> str:
+def render_sequence_display(seq: str, width: int) -> str:
     index_width = len(str(len(seq)))
     lines: List[str] = []
     for start in range(1, len(seq) + 1, width):
@@ -0,0 +1,215 @@
+from __future__ import annotations
+
+import mmap
+import shutil
+import struct
+import tempfile
+from array import array
+from bisect import bisect_left, bisect_right
+from contextlib import ExitStack
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Mapping
+
+from .binfile import assemble_sections, read_uint, write_uint
+
+RESULTS_MAGIC = b"PCSITES1"
+# magic, chain/enzyme/site counts, then the byte offsets of the chain row
+# offsets, chain, enzyme and position columns, chain id offsets, chain id
+# blob, enzyme name offsets and enzyme name blob. All integers are
+# little-endian; row r of the columns is one site.
+_HEADER = struct.Struct("<8s11Q")
+_SECTIONS = (
+    "chain_rows",
+    "chain_column",
+    "enzyme_column",
+    "position_column",
+    "chain_offsets",
+    "chain_blob",
+    "enzyme_offsets",
+    "enzyme_blob",
+)
+
+
+class ResultsFileWriter:
+    """Stream per-chain cleavage sites into a binary results file.
+
+    Rows are sorted by chain (in the order added), enzyme (in the order of
+    ``enzymes``) and position. Columns are appended to temporary files as
+    chains arrive and assembled into ``path`` by :meth:`close`.
+    """
+
+    def __init__(self, path: str, enzymes: List[str]) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.enzymes = list(enzymes)
+        self.chain_count = 0
+        self.site_count = 0
+        self._work_dir = Path(
+            tempfile.mkdtemp(prefix=".pcsites-", dir=self.path.parent)
+        )
+        self._stack = ExitStack()
+        self._files = {
+            name: self._stack.enter_context(open(self._work_dir / name, "wb"))
+            for name in _SECTIONS
+        }
+        write_uint(self._files["chain_rows"], "Q", [0])
+        write_uint(self._files["chain_offsets"], "Q", [0])
+        write_uint(self._files["enzyme_offsets"], "Q", [0])
+        enzyme_blob = self._files["enzyme_blob"]
+        for name in self.enzymes:
+            enzyme_blob.write(name.encode("utf-8"))
+            write_uint(self._files["enzyme_offsets"], "Q", [enzyme_blob.tell()])
+
+    def __enter__(self) -> "ResultsFileWriter":
+        return self
+
+    def __exit__(self, exc_type, *exc_info) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
+
+    def add(
+        self, chain_id: str, sites_by_enzyme: Mapping[str, Iterable[int]]
+    ) -> None:
+        chain = self.chain_count
+        enzyme_column = array("H")
+        position_column = array("I")
+        for enzyme, name in enumerate(self.enzymes):
+            sites = sites_by_enzyme.get(name, ())
+            before = len(position_column)
+            position_column.extend(sites)
+            enzyme_column.extend([enzyme] * (len(position_column) - before))
+        self.site_count += len(position_column)
+        self.chain_count += 1
+
+        write_uint(self._files["chain_column"], "I", [chain] * len(position_column))
+        write_uint(self._files["enzyme_column"], "H", enzyme_column)
+        write_uint(self._files["position_column"], "I", position_column)
+        write_uint(self._files["chain_rows"], "Q", [self.site_count])
+        chain_blob = self._files["chain_blob"]
+        chain_blob.write(chain_id.encode("utf-8"))
+        write_uint(self._files["chain_offsets"], "Q", [chain_blob.tell()])
+
+    def close(self) -> None:
+        if not self._work_dir.exists():
+            return
+        try:
+            self._stack.close()
+            header = (
+                RESULTS_MAGIC,
+                self.chain_count,
+                len(self.enzymes),
+                self.site_count,
+            )
+            assemble_sections(
+                self.path,
+                _HEADER.size,
+                lambda offsets: _HEADER.pack(*header, *offsets),
+                [self._work_dir / name for name in _SECTIONS],
+            )
+        finally:
+            shutil.rmtree(self._work_dir, ignore_errors=True)
+
+    def discard(self) -> None:
+        self._stack.close()
+        shutil.rmtree(self._work_dir, ignore_errors=True)
+
+
+class ResultsFile:
+    """Memory-mapped reader for files written by :class:`ResultsFileWriter`.
+
+    Only the header and the enzyme names are read up front; :meth:`sites`
+    touches the rows of a single chain.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._data) < _HEADER.size or self._data[:8] != RESULTS_MAGIC:
+            self._data.close()
+            raise ValueError(f"Not a results file: {path}")
+        fields = _HEADER.unpack_from(self._data, 0)
+        self.chain_count, self.enzyme_count, self.site_count = fields[1:4]
+        self._offsets = dict(zip(_SECTIONS, fields[4:]))
+        self.enzymes = [
+            self._string("enzyme", index) for index in range(self.enzyme_count)
+        ]
+        self._enzyme_index = {name: index for index, name in enumerate(self.enzymes)}
+        self._chain_index: Dict[str, int] | None = None
+
+    def __len__(self) -> int:
+        return self.chain_count
+
+    def __enter__(self) -> "ResultsFile":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._data.close()
+
+    def chain_id(self, index: int) -> str:
+        return self._string("chain", index)
+
+    def chain_ids(self) -> Iterator[str]:
+        for index in range(self.chain_count):
+            yield self.chain_id(index)
+
+    def chain_index(self, chain_id: str) -> int:
+        if self._chain_index is None:
+            self._chain_index = {}
+            for index, name in enumerate(self.chain_ids()):
+                self._chain_index.setdefault(name, index)
+        try:
+            return self._chain_index[chain_id]
+        except KeyError:
+            raise KeyError(f"Unknown chain: {chain_id}") from None
+
+    def sites(self, chain: str | int, enzyme: str) -> array:
+        """Return the sorted 1-based sites of ``enzyme`` in ``chain``."""
+        try:
+            enzyme_index = self._enzyme_index[enzyme]
+        except KeyError:
+            raise KeyError(f"Unknown enzyme: {enzyme}") from None
+        first, last = self._rows(chain)
+        enzymes = self._column("enzyme_column", first, last - first, "H")
+        lo = bisect_left(enzymes, enzyme_index)
+        hi = bisect_right(enzymes, enzyme_index, lo)
+        return self._column("position_column", first + lo, hi - lo, "I")
+
+    def chain_sites(self, chain: str | int) -> Dict[str, array]:
+        """Return the sites of every enzyme in ``chain``, keyed by enzyme name."""
+        first, last = self._rows(chain)
+        enzymes = self._column("enzyme_column", first, last - first, "H")
+        positions = self._column("position_column", first, last - first, "I")
+        sites_by_enzyme: Dict[str, array] = {}
+        for index, name in enumerate(self.enzymes):
+            lo = bisect_left(enzymes, index)
+            hi = bisect_right(enzymes, index, lo)
+            sites_by_enzyme[name] = positions[lo:hi]
+        return sites_by_enzyme
+
+    def _rows(self, chain: str | int) -> tuple[int, int]:
+        index = chain if isinstance(chain, int) else self.chain_index(chain)
+        if not 0 <= index < self.chain_count:
+            raise IndexError(f"Chain index out of range: {index}")
+        first, last = read_uint(
+            self._data, self._offsets["chain_rows"] + index * 8, 2, "Q"
+        )
+        return first, last
+
+    def _column(self, section: str, row: int, count: int, typecode: str) -> array:
+        itemsize = array(typecode).itemsize
+        return read_uint(
+            self._data, self._offsets[section] + row * itemsize, count, typecode
+        )
+
+    def _string(self, table: str, index: int) -> str:
+        start, end = read_uint(
+            self._data, self._offsets[f"{table}_offsets"] + index * 8, 2, "Q"
+        )
+        blob = self._offsets[f"{table}_blob"]
+        return self._data[blob + start : blob + end].decode("utf-8")
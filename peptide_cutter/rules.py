@@ -1,8 +1,11 @@
 from __future__ import annotations
 
-import json
-from dataclasses import dataclass
-from typing import Dict, Iterable, List
+import hashlib
+import os
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Pattern, Tuple
 
 POSITIONS = ["P4", "P3", "P2", "P1", "P1_prime", "P2_prime"]
 CUT = "between P1 and P1_prime"
@@ -15,6 +18,18 @@ OFFSETS = {
     "P2_prime": 2,
 }
 
+# Residues are encoded as one-hot bits so that a position constraint becomes a
+# single allowed-residue mask: A..Z use bits 0..25, any other character bit 26.
+# Code 0 is reserved for padding beyond the sequence ends and matches nothing.
+OTHER_RESIDUE_BIT = 1 << 26
+ANY_RESIDUE_MASK = (1 << 27) - 1
+PAD_LEFT = -min(OFFSETS.values())
+PAD_RIGHT = max(OFFSETS.values())
+
+# Bump whenever the pickled RulesDB layout changes so stale caches are ignored.
+RULES_CACHE_VERSION = 2
+RULES_CACHE_ENV = "PEPTIDE_CUTTER_CACHE_DIR"
+
 
 @dataclass(frozen=True)
 class PositionConstraint:
@@ -35,6 +50,18 @@ class EnzymeRule:
     blocks: List[Motif]
 
 
+@dataclass(frozen=True)
+class CompiledMotif:
+    checks: Tuple[Tuple[int, int], ...]
+
+
+@dataclass(frozen=True)
+class CompiledRule:
+    name: str
+    cleaves: Tuple[CompiledMotif, ...]
+    blocks: Tuple[CompiledMotif, ...]
+
+
 @dataclass(frozen=True)
 class RulesDB:
     schema_version: str
@@ -42,12 +69,95 @@ class RulesDB:
     positions: List[str]
     cut: str
     enzymes: Dict[str, EnzymeRule]
+    compiled: Dict[str, CompiledRule] = field(default_factory=dict)
+    cache: Dict[object, object] = field(
+        default_factory=dict, compare=False, repr=False
+    )
 
+    def pattern(self, enzyme_name: str) -> Pattern[str]:
+        """Return the compiled bond pattern of an enzyme, cached per RulesDB."""
+        key = ("pattern", enzyme_name)
+        compiled = self.cache.get(key)
+        if compiled is None:
+            if enzyme_name not in self.enzymes:
+                raise KeyError(f"Unknown enzyme: {enzyme_name}")
+            compiled = compile_rule_pattern(self.enzymes[enzyme_name])
+            self.cache[key] = compiled
+        return compiled
+
+
+def load_rules(path: str, use_cache: bool = False) -> RulesDB:
+    """Load, validate and compile a rules file.
+
+    With ``use_cache`` the compiled RulesDB is also kept in a pickle sidecar
+    under :func:`rules_cache_dir`, keyed by the file path, its mtime and the
+    SHA-256 of its content; a matching cache entry is returned without JSON
+    parsing or validation.
+    """
+    if use_cache:
+        return _load_rules_cached(path)
+    import json
 
-def load_rules(path: str) -> RulesDB:
     with open(path, "r", encoding="utf-8") as f:
         data = json.load(f)
+    return _rules_from_data(data)
+
+
+def rules_cache_dir() -> Path:
+    override = os.environ.get(RULES_CACHE_ENV)
+    if override:
+        return Path(override)
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join("~", ".cache")
+    return Path(base).expanduser() / "peptide-cutter"
+
 
+def _load_rules_cached(path: str) -> RulesDB:
+    import pickle
+
+    abs_path = os.path.abspath(path)
+    mtime_ns = os.stat(abs_path).st_mtime_ns
+    with open(abs_path, "rb") as f:
+        raw = f.read()
+    key = (
+        RULES_CACHE_VERSION,
+        abs_path,
+        mtime_ns,
+        hashlib.sha256(raw).hexdigest(),
+    )
+    path_digest = hashlib.sha256(abs_path.encode("utf-8")).hexdigest()[:16]
+    cache_path = rules_cache_dir() / f"rules-{path_digest}.pickle"
+
+    try:
+        with open(cache_path, "rb") as f:
+            stored_key, fields = pickle.load(f)
+        if stored_key == key:
+            return RulesDB(*fields)
+    except Exception:  # noqa: BLE001 - a missing or unreadable cache is a miss
+        pass
+
+    import json
+
+    rules = _rules_from_data(json.loads(raw.decode("utf-8")))
+    fields = (
+        rules.schema_version,
+        rules.description,
+        rules.positions,
+        rules.cut,
+        rules.enzymes,
+        rules.compiled,
+    )
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, "wb") as f:
+            pickle.dump((key, fields), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        pass
+    return rules
+
+
+def _rules_from_data(data: dict) -> RulesDB:
     for key in ("schema_version", "description", "positions", "cut", "enzymes"):
         if key not in data:
             raise ValueError(f"Rules file missing required key: {key}")
@@ -74,9 +184,110 @@ def load_rules(path: str) -> RulesDB:
         positions=positions,
         cut=data["cut"],
         enzymes=enzymes,
+        compiled={name: compile_rule(rule) for name, rule in enzymes.items()},
     )
 
 
+def residue_bit(aa: str) -> int:
+    if "A" <= aa <= "Z":
+        return 1 << (ord(aa) - ord("A"))
+    return OTHER_RESIDUE_BIT
+
+
+def encode_sequence(seq: str) -> List[int]:
+    """Return residue bit codes for ``seq`` with zero padding at both ends.
+
+    Residue ``i`` (1-based) is stored at index ``i - 1 + PAD_LEFT``, so every
+    P4..P2' offset around any bond in the sequence is a valid index.
+    """
+    codes = [0] * PAD_LEFT
+    codes.extend(residue_bit(aa) for aa in seq)
+    codes.extend([0] * PAD_RIGHT)
+    return codes
+
+
+def compile_rule(rule: EnzymeRule) -> CompiledRule:
+    return CompiledRule(
+        name=rule.name,
+        cleaves=tuple(compile_motif(motif) for motif in rule.cleaves),
+        blocks=tuple(compile_motif(motif) for motif in rule.blocks),
+    )
+
+
+def compile_motif(motif: Motif) -> CompiledMotif:
+    checks: List[Tuple[int, int]] = []
+    for constraint in motif.constraints:
+        checks.append((constraint.offset, _constraint_mask(constraint)))
+    # Test the most restrictive positions first so mismatches fail early.
+    checks.sort(key=lambda item: bin(item[1]).count("1"))
+    return CompiledMotif(checks=tuple(checks))
+
+
+def compile_rule_pattern(rule: EnzymeRule) -> Pattern[str]:
+    """Translate a rule into a zero-width regex anchored at the scissile bond.
+
+    A match at string index ``i`` means a cut after residue ``i`` (1-based).
+    Cleave motifs become alternated lookbehind/lookahead pairs, block motifs
+    negative lookarounds at the same position. Index 0 is never a bond and
+    must be skipped by the caller.
+    """
+    cleaves = [p for p in map(_motif_pattern, rule.cleaves) if p is not None]
+    if not cleaves:
+        return re.compile(r"(?!)")
+    parts = ["(?:" + "|".join(cleaves) + ")"]
+    for motif in rule.blocks:
+        block = _motif_pattern(motif)
+        if block is not None:
+            parts.append(f"(?!{block})")
+    return re.compile("".join(parts), re.DOTALL)
+
+
+def _motif_pattern(motif: Motif) -> Optional[str]:
+    by_offset: Dict[int, str] = {}
+    for constraint in motif.constraints:
+        char_class = _constraint_class(constraint)
+        if char_class is None:
+            return None
+        by_offset[constraint.offset] = char_class
+    if not by_offset:
+        return ""
+
+    pattern = ""
+    first = min(by_offset)
+    if first <= 0:
+        behind = "".join(by_offset.get(off, ".") for off in range(first, 1))
+        pattern += f"(?<={behind})"
+    last = max(by_offset)
+    if last >= 1:
+        ahead = "".join(by_offset.get(off, ".") for off in range(1, last + 1))
+        pattern += f"(?={ahead})"
+    return pattern
+
+
+def _constraint_class(constraint: PositionConstraint) -> Optional[str]:
+    if constraint.include:
+        allowed = sorted(constraint.include - constraint.exclude)
+        if not allowed:
+            return None
+        return "[" + "".join(re.escape(aa) for aa in allowed) + "]"
+    if constraint.exclude:
+        excluded = sorted(constraint.exclude)
+        return "[^" + "".join(re.escape(aa) for aa in excluded) + "]"
+    return "."
+
+
+def _constraint_mask(constraint: PositionConstraint) -> int:
+    if constraint.include:
+        mask = 0
+        for aa in constraint.include:
+            mask |= residue_bit(aa)
+    else:
+        mask = ANY_RESIDUE_MASK
+    for aa in constraint.exclude:
+        mask &= ~residue_bit(aa)
+    return mask
+
+
 def _parse_enzyme_rule(name: str, rule_data: dict) -> EnzymeRule:
     if not isinstance(rule_data, dict):
         raise ValueError(f"Invalid rule for enzyme '{name}'.")
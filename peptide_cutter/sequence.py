@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 import re
-from typing import Dict, List, Tuple
+from typing import Dict, Iterable, Iterator, List, Tuple
 
 STANDARD_AA = set("ACDEFGHIKLMNPQRSTVWY")
 
@@ -31,32 +31,30 @@ def parse_fasta_records(
     text: str, max_records: int | None = None
 ) -> List[Tuple[str, str, str]]:
     records: List[Tuple[str, str, str]] = []
+    for record in iter_fasta_records(text.splitlines()):
+        if max_records is not None and len(records) >= max_records:
+            raise ValueError(f"FASTA contains more than {max_records} records.")
+        records.append(record)
+    return records
+
+
+def iter_fasta_records(lines: Iterable[str]) -> Iterator[Tuple[str, str, str]]:
+    """Yield ``(accession, description, seq)`` records one at a time.
+
+    ``lines`` may be an open file handle, so memory is bounded by the largest
+    single record rather than by the whole file.
+    """
     cur_id: str | None = None
     cur_desc: str = "N/A"
     cur_seq: List[str] = []
 
-    def push_record() -> None:
-        nonlocal cur_id, cur_desc, cur_seq
-        if cur_id is None:
-            return
-        seq = re.sub(r"[\s\d]+", "", "".join(cur_seq)).upper()
-        records.append((cur_id, cur_desc, seq))
-        cur_id = None
-        cur_desc = "N/A"
-        cur_seq = []
-
-    lines = text.splitlines()
     for raw in lines:
         line = raw.strip()
         if not line:
             continue
         if line.startswith(">"):
             if cur_id is not None:
-                push_record()
-            if max_records is not None and len(records) >= max_records:
-                raise ValueError(
-                    f"FASTA contains more than {max_records} records."
-                )
+                yield cur_id, cur_desc, _clean_sequence(cur_seq)
             header = line[1:].strip()
             if not header:
                 cur_id = "User_Sequence"
@@ -65,15 +63,18 @@ def parse_fasta_records(
                 parts = header.split(None, 1)
                 cur_id = parts[0] or "User_Sequence"
                 cur_desc = parts[1].strip() if len(parts) > 1 else "N/A"
+            cur_seq = []
         else:
             if cur_id is None:
                 raise ValueError("FASTA must start with a '>' header line.")
             cur_seq.append(line)
 
     if cur_id is not None:
-        push_record()
+        yield cur_id, cur_desc, _clean_sequence(cur_seq)
 
-    return records
+
+def _clean_sequence(lines: List[str]) -> str:
+    return re.sub(r"[\s\d]+", "", "".join(lines)).upper()
 
 
 def validate_sequence(seq: str, strict: bool) -> Tuple[str, Dict]:
@@ -1,7 +1,14 @@
 from __future__ import annotations
 
+import io
+import json
+import os
+import shutil
+import tempfile
+from functools import lru_cache
 from html import escape
-from typing import Dict, List
+from pathlib import Path
+from typing import Dict, Iterable, List, TextIO, Tuple
 
 
 _PROLINE_NOTE_URL = "https://pubmed.ncbi.nlm.nih.gov/9695945/"
@@ -593,22 +600,85 @@ _CSS_INDEX = """
 """
 
 
-def _html_page(title: str, body: str, css: str, lang: str = "en") -> str:
-    return f"""<!doctype html>
+_CSS_PAGED = """
+.toc-search {
+  width: 100%;
+  margin: 0 0 14px;
+  padding: 10px 14px;
+  border-radius: 12px;
+  border: 1px solid var(--border);
+  background: #ffffff;
+  font-family: var(--sans);
+  font-size: 0.95rem;
+  color: var(--ink);
+}
+
+.toc-item[hidden] {
+  display: none;
+}
+
+.page-nav {
+  margin-top: 18px;
+}
+
+.page-footer {
+  margin-top: 30px;
+}
+"""
+
+
+# Stylesheets of the single, index and paginated pages; the paginated one
+# includes the others and is the one written by write_stylesheet().
+_STYLE_SINGLE = (_CSS_COMMON + _CSS_SINGLE).strip()
+_STYLE_INDEX = (_CSS_COMMON + _CSS_SINGLE + _CSS_INDEX).strip()
+_STYLE_PAGED = (_CSS_COMMON + _CSS_SINGLE + _CSS_INDEX + _CSS_PAGED).strip()
+
+# Location of the shared stylesheet, relative to the report directory.
+STYLESHEET_PATH = "assets/peptide_cutter.css"
+
+
+def write_stylesheet(report_dir: Path) -> Path:
+    """Write the stylesheet linked by reports rendered with ``stylesheet``."""
+    path = Path(report_dir) / STYLESHEET_PATH
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(_STYLE_PAGED + "\n", encoding="utf-8")
+    return path
+
+
+def _html_page(
+    title: str,
+    body: str,
+    style: str,
+    lang: str = "en",
+    stylesheet: str | None = None,
+) -> str:
+    head, tail = _page_frame(title, style, lang, stylesheet)
+    return head + body + tail
+
+
+@lru_cache(maxsize=64)
+def _page_frame(
+    title: str, style: str, lang: str, stylesheet: str | None
+) -> Tuple[str, str]:
+    """Return the static page text around the body, built once per page kind.
+
+    ``style`` is inlined unless a ``stylesheet`` URL is given to link instead.
+    """
+    if stylesheet is None:
+        style_tag = f"  <style>\n{style}\n  </style>"
+    else:
+        style_tag = f'  <link rel="stylesheet" href="{escape(stylesheet)}" />'
+    head = f"""<!doctype html>
 <html lang="{escape(lang)}">
 <head>
   <meta charset="utf-8" />
   <meta name="viewport" content="width=device-width, initial-scale=1" />
   <title>{escape(title)}</title>
-  <style>
-{css.strip()}
-  </style>
+{style_tag}
 </head>
 <body>
-{body}
-</body>
-</html>
 """
+    return head, "\n</body>\n</html>\n"
 
 
 def _unique_anchor(base: str, used: set[str]) -> str:
@@ -624,25 +694,47 @@ def _unique_anchor(base: str, used: set[str]) -> str:
     return unique
 
 
+def render_report_sections(
+    seq: str, summary: Dict, line_width: int, part4_text: str
+) -> Dict[str, str]:
+    """Render the four report section bodies, which depend only on the sequence.
+
+    Records sharing a sequence can reuse the result in :func:`build_html_report`;
+    only the accession header is regenerated per record.
+    """
+    if line_width <= 0:
+        raise ValueError("line_width must be positive.")
+    return {
+        "part1": _render_part1_body(seq, line_width),
+        "part2": _render_part2_body(summary.get("selected_sorted", [])),
+        "part3": _render_part3_body(summary),
+        "part4": _render_part4_body(part4_text),
+    }
+
+
 def build_html_report(
     seq: str,
     meta: Dict[str, str],
     summary: Dict,
     line_width: int,
     part4_text: str,
+    sections: Dict[str, str] | None = None,
+    stylesheet: str | None = None,
 ) -> str:
     if line_width <= 0:
         raise ValueError("line_width must be positive.")
+    if sections is None:
+        sections = render_report_sections(seq, summary, line_width, part4_text)
 
     accession = escape(meta.get("accession") or "User_Sequence")
     length = len(seq)
     enzymes = summary.get("selected_sorted", [])
     enzyme_count = str(len(enzymes)) if enzymes else "0"
 
-    part1_body = _render_part1_body(seq, line_width)
-    part2_body = _render_part2_body(enzymes)
-    part3_body = _render_part3_body(summary)
-    part4_body = _render_part4_body(part4_text)
+    part1_body = sections["part1"]
+    part2_body = sections["part2"]
+    part3_body = sections["part3"]
+    part4_body = sections["part4"]
 
     body = f"""
 <a class="skip-link" href="#content">Skip to content</a>
@@ -702,57 +794,285 @@ def build_html_report(
   <footer>Generated by peptide-cutter</footer>
 </div>
 """
-    return _html_page("PeptideCutter Report", body, _CSS_COMMON + _CSS_SINGLE)
-
-
-def build_html_index_report(
-    records: List[Dict],
-    line_width: int,
-    title: str = "PeptideCutter Multi-Sequence Report",
-) -> str:
-    if line_width <= 0:
-        raise ValueError("line_width must be positive.")
-
-    total = len(records)
-    toc_items: List[str] = []
-    sections: List[str] = []
-    used_anchors: set[str] = set()
-
-    for rec in records:
+    return _html_page(
+        "PeptideCutter Report", body, _STYLE_SINGLE, stylesheet=stylesheet
+    )
+
+
+class HtmlIndexWriter:
+    """Write the multi-sequence index report one record at a time.
+
+    Chain sections are rendered as records arrive and spooled to temporary
+    files; only a small TOC entry is kept per record, so memory does not grow
+    with the sequences of the run. With ``page_size`` the sections are split
+    over pages of at most that many chains, ``<name>-<n>.html``, and the
+    ``<name>.html`` index only holds a searchable TOC linking into them, plus
+    a ``<name>.json`` index of the chains.
+    """
+
+    def __init__(
+        self,
+        line_width: int,
+        title: str = "PeptideCutter Multi-Sequence Report",
+        spool_dir: str | None = None,
+        page_size: int = 0,
+        name: str = "All_in_One",
+        stylesheet: str | None = None,
+    ) -> None:
+        if line_width <= 0:
+            raise ValueError("line_width must be positive.")
+        if page_size < 0:
+            raise ValueError("page_size must not be negative.")
+        self.line_width = line_width
+        self.title = title
+        self.page_size = page_size
+        self.name = name
+        self.stylesheet = stylesheet
+        self._spool_dir = spool_dir
+        self._toc: List[Tuple[str, str, int, str]] = []
+        self._used_anchors: set[str] = set()
+        self._pages: List[Path] = []
+        self._spool: TextIO | None = None
+
+    def __enter__(self) -> "HtmlIndexWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self._toc)
+
+    def add(self, rec: Dict) -> None:
+        """Render the chain section of one record.
+
+        ``rec`` has ``chain_id``/``safe_id`` (or ``meta``), ``seq``,
+        ``summary`` and ``part4_text``, and optionally the ``sections`` of
+        :func:`render_report_sections` to skip rendering them again.
+        """
         chain_id = rec.get("chain_id") or rec.get("meta", {}).get("accession") or "SEQ"
         safe_id = rec.get("safe_id") or chain_id
-        base_anchor = _safe_anchor(safe_id)
-        anchor = _unique_anchor(base_anchor, used_anchors)
-        seq = rec["seq"]
+        anchor = _unique_anchor(_safe_anchor(safe_id), self._used_anchors)
         summary = rec["summary"]
-        part4_text = rec["part4_text"]
-
+        sections = rec.get("sections") or render_report_sections(
+            rec["seq"], summary, self.line_width, rec["part4_text"]
+        )
         enzymes = summary.get("selected_sorted", [])
         enzyme_count = str(len(enzymes)) if enzymes else "0"
-        length = len(seq)
-
-        toc_items.append(
-            "\n".join(
-                [
-                    f"<a href=\"#{anchor}\" class=\"toc-item\">",
-                    f"  <div class=\"toc-name\">{escape(str(chain_id))}</div>",
-                    f"  <div class=\"toc-meta\">{length} aa · {enzyme_count} enzymes</div>",
-                    "  <div class=\"toc-arrow\">&gt;</div>",
-                    "</a>",
-                ]
+        length = len(rec["seq"])
+
+        if self._spool is None:
+            self._open_spool()
+        elif self.page_size and len(self._toc) % self.page_size == 0:
+            self._finish_page(has_next=True)
+            self._open_spool()
+        else:
+            self._spool.write("\n")
+        self._spool.write(
+            _render_index_section(anchor, str(chain_id), length, enzyme_count, sections)
+        )
+        self._toc.append((anchor, str(chain_id), length, enzyme_count))
+
+    def write_to(self, out: TextIO) -> None:
+        """Write the single-page report (``page_size`` 0) to ``out``."""
+        if self.page_size:
+            raise ValueError("A paginated index is written with save().")
+        head, tail = _index_page(
+            self.title, len(self._toc), self._toc_html(), stylesheet=self.stylesheet
+        )
+        out.write(head)
+        if self._spool is not None:
+            self._spool.seek(0)
+            shutil.copyfileobj(self._spool, out)
+        out.write(tail)
+
+    def save(self, out_dir: Path) -> List[Path]:
+        """Write the report into ``out_dir``; return the paths written."""
+        out_dir = Path(out_dir)
+        index_path = out_dir / f"{self.name}.html"
+        if not self.page_size:
+            with open(index_path, "w", encoding="utf-8") as f:
+                self.write_to(f)
+            return [index_path]
+
+        paths: List[Path] = []
+        if self._spool is not None:
+            self._finish_page(has_next=False)
+        for page, spool_path in enumerate(self._pages, start=1):
+            page_path = out_dir / self._page_name(page)
+            shutil.move(spool_path, page_path)
+            paths.append(page_path)
+        self._pages = []
+
+        head, tail = _index_page(
+            self.title,
+            len(self._toc),
+            self._toc_html(),
+            hint=_PAGED_TOC_HINT,
+            style=_STYLE_PAGED,
+            stylesheet=self.stylesheet,
+        )
+        page_links = "\n".join(
+            f'      <a href="{self._page_name(page)}">Page {page}</a>'
+            for page in range(1, len(paths) + 1)
+        )
+        with open(index_path, "w", encoding="utf-8") as f:
+            f.write(head)
+            f.write(
+                '<nav class="nav page-nav" aria-label="Report pages">\n'
+                f"{page_links}\n"
+                "    </nav>\n"
+                f"{_TOC_SEARCH_SCRIPT}"
+            )
+            f.write(tail)
+
+        json_path = out_dir / f"{self.name}.json"
+        index = {
+            "title": self.title,
+            "page_size": self.page_size,
+            "pages": [path.name for path in paths],
+            "chains": [
+                {
+                    "chain_id": chain_id,
+                    "length": length,
+                    "enzyme_count": int(enzyme_count),
+                    "page": number // self.page_size + 1,
+                    "anchor": anchor,
+                }
+                for number, (anchor, chain_id, length, enzyme_count) in enumerate(
+                    self._toc
+                )
+            ],
+        }
+        json_path.write_text(
+            json.dumps(index, ensure_ascii=False) + "\n", encoding="utf-8"
+        )
+        return [index_path, json_path] + paths
+
+    def close(self) -> None:
+        if self._spool is not None:
+            self._spool.close()
+            self._spool = None
+        for spool_path in self._pages:
+            spool_path.unlink(missing_ok=True)
+        self._pages = []
+
+    def _open_spool(self) -> None:
+        if not self.page_size:
+            self._spool = tempfile.TemporaryFile(
+                mode="w+", encoding="utf-8", dir=self._spool_dir
             )
+            return
+        spool_dir = Path(self._spool_dir or tempfile.gettempdir())
+        spool_path = spool_dir / (
+            f".{self.name}-{len(self._pages) + 1}.{os.getpid()}.html.tmp"
         )
+        self._pages.append(spool_path)
+        self._spool = open(spool_path, "w", encoding="utf-8")
+        head, _ = self._section_page(len(self._pages), has_next=False)
+        self._spool.write(head)
+
+    def _finish_page(self, has_next: bool) -> None:
+        _, tail = self._section_page(len(self._pages), has_next)
+        self._spool.write(tail)
+        self._spool.close()
+        self._spool = None
+
+    def _section_page(self, page: int, has_next: bool) -> Tuple[str, str]:
+        links = [f'<a href="{self.name}.html">Contents</a>']
+        if page > 1:
+            links.append(f'<a href="{self._page_name(page - 1)}">Previous</a>')
+        if has_next:
+            links.append(f'<a href="{self._page_name(page + 1)}">Next</a>')
+        nav = (
+            '<nav class="nav page-nav" aria-label="Report pages">\n      '
+            + "\n      ".join(links)
+            + "\n    </nav>"
+        )
+        body = f"""
+<a class="skip-link" href="#content">Skip to content</a>
+<div class="report" id="top">
+  <header class="hero">
+    <div class="hero-top">
+      <div>PeptideCutter</div>
+      <div class="hero-badge">Sequence Digest</div>
+    </div>
+    <div class="title-row">
+      <h1>{escape(self.title)}</h1>
+      <div class="total-card"><strong>Page</strong><span>{page}</span></div>
+    </div>
+    {nav}
+  </header>
+
+  <main id="content">
+    {_SECTIONS_SLOT}
+  </main>
+
+  <div class="page-footer">
+    {nav}
+  </div>
+
+  <footer>Generated by peptide-cutter</footer>
+</div>
+"""
+        page_html = _html_page(
+            f"{self.title} · Page {page}",
+            body,
+            _STYLE_PAGED,
+            stylesheet=self.stylesheet,
+        )
+        head, _, tail = page_html.rpartition(_SECTIONS_SLOT)
+        return head, tail
+
+    def _page_name(self, page: int) -> str:
+        return f"{self.name}-{page}.html"
+
+    def _toc_html(self) -> str:
+        toc_items = []
+        for number, (anchor, chain_id, length, enzyme_count) in enumerate(self._toc):
+            href = f"#{anchor}"
+            if self.page_size:
+                href = self._page_name(number // self.page_size + 1) + href
+            toc_items.append(
+                "\n".join(
+                    [
+                        f"<a href=\"{href}\" class=\"toc-item\">",
+                        f"  <div class=\"toc-name\">{escape(chain_id)}</div>",
+                        f"  <div class=\"toc-meta\">{length} aa · {enzyme_count} enzymes</div>",
+                        "  <div class=\"toc-arrow\">&gt;</div>",
+                        "</a>",
+                    ]
+                )
+            )
+        return "\n".join(toc_items) if toc_items else "<p>No records found.</p>"
 
-        part1_body = _render_part1_body(seq, line_width)
-        part2_body = _render_part2_body(enzymes)
-        part3_body = _render_part3_body(summary)
-        part4_body = _render_part4_body(part4_text)
 
-        section_html = f"""
+def build_html_index_report(
+    records: Iterable[Dict],
+    line_width: int,
+    title: str = "PeptideCutter Multi-Sequence Report",
+    stylesheet: str | None = None,
+) -> str:
+    with HtmlIndexWriter(line_width, title, stylesheet=stylesheet) as writer:
+        for rec in records:
+            writer.add(rec)
+        out = io.StringIO()
+        writer.write_to(out)
+    return out.getvalue()
+
+
+def _render_index_section(
+    anchor: str,
+    chain_id: str,
+    length: int,
+    enzyme_count: str,
+    sections: Dict[str, str],
+) -> str:
+    return f"""
     <section id="{anchor}" class="chain-section">
       <div class="chain-header">
         <div>
-          <h2>{escape(str(chain_id))}</h2>
+          <h2>{escape(chain_id)}</h2>
           <p class="chain-subtitle">Length {length} aa · Enzymes {enzyme_count}</p>
         </div>
         <nav class="nav chain-nav" aria-label="Chain sections">
@@ -765,32 +1085,58 @@ def build_html_index_report(
 
       <div id="{anchor}-part1" class="chain-block">
         <div class="section-title"><span class="tag">Part 1</span><span class="title">Input Sequence</span></div>
-        {part1_body}
+        {sections["part1"]}
       </div>
 
       <div id="{anchor}-part2" class="chain-block">
         <div class="section-title"><span class="tag">Part 2</span><span class="title">Selected Enzymes</span></div>
-        {part2_body}
+        {sections["part2"]}
       </div>
 
       <div id="{anchor}-part3" class="chain-block">
         <div class="section-title"><span class="tag">Part 3</span><span class="title">Cleavage Site Table</span></div>
-        {part3_body}
+        {sections["part3"]}
       </div>
 
       <div id="{anchor}-part4" class="chain-block tracks">
         <div class="section-title"><span class="tag">Part 4</span><span class="title">Cleavage Mapping</span></div>
-        {part4_body}
+        {sections["part4"]}
       </div>
 
       <div class="chain-footer"><a href="#top">Back to top</a></div>
     </section>
         """.rstrip()
-        sections.append(section_html)
 
-    toc_html = "\n".join(toc_items) if toc_items else "<p>No records found.</p>"
-    sections_html = "\n".join(sections)
 
+# Stands in for the chain sections while the index page is formatted.
+_SECTIONS_SLOT = "\x00sections\x00"
+
+
+_TOC_HINT = (
+    '<p class="toc-hint">Click a chain name to jump to its detailed report section.</p>'
+)
+_PAGED_TOC_HINT = """<p class="toc-hint">Click a chain name to open its report page.</p>
+        <input class="toc-search" type="search" placeholder="Filter chains" aria-label="Filter chains" />"""
+_TOC_SEARCH_SCRIPT = """    <script>
+      document.querySelector(".toc-search").addEventListener("input", function (event) {
+        var query = event.target.value.toLowerCase();
+        document.querySelectorAll(".toc-item").forEach(function (item) {
+          var name = item.querySelector(".toc-name").textContent.toLowerCase();
+          item.hidden = query !== "" && name.indexOf(query) < 0;
+        });
+      });
+    </script>"""
+
+
+def _index_page(
+    title: str,
+    total: int,
+    toc_html: str,
+    hint: str = _TOC_HINT,
+    style: str = _STYLE_INDEX,
+    stylesheet: str | None = None,
+) -> Tuple[str, str]:
+    """Return the index page around its chain sections as ``(head, tail)``."""
     body = f"""
 <a class="skip-link" href="#content">Skip to content</a>
 <div class="report" id="top">
@@ -805,7 +1151,7 @@ def build_html_index_report(
     </div>
     <div class="hero-grid">
       <div class="hero-panel">
-        <p class="toc-hint">Click a chain name to jump to its detailed report section.</p>
+        {hint}
         <div class="toc-grid">
           {toc_html}
         </div>
@@ -814,13 +1160,15 @@ def build_html_index_report(
   </header>
 
   <main id="content">
-    {sections_html}
+    {_SECTIONS_SLOT}
   </main>
 
   <footer>Generated by peptide-cutter</footer>
 </div>
 """
-    return _html_page(title, body, _CSS_COMMON + _CSS_SINGLE + _CSS_INDEX)
+    page = _html_page(title, body, style, stylesheet=stylesheet)
+    head, _, tail = page.rpartition(_SECTIONS_SLOT)
+    return head, tail
 
 
 def _render_part1_body(seq: str, line_width: int) -> str:
@@ -863,7 +1211,7 @@ def _render_part3_body(summary: Dict) -> str:
         )
         tbody_rows: List[str] = []
         for row in rows:
-            positions = ", ".join(str(p) for p in row.get("sites", [])) or "-"
+            positions = ", ".join(map(str, row.get("sites", ()))) or "-"
             cells = "".join(
                 [
                     f"<th scope=\"row\">{escape(str(row['name']))}</th>",
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+DEFAULT_MODULE = "peptide_cutter.cli"
+DEFAULT_BUDGET_MS = 100.0
+
+# Modules that only specific output stages need; importing the CLI must not
+# pull them in.
+LAZY_MODULES = (
+    "peptide_cutter.aggregate",
+    "peptide_cutter.render",
+    "peptide_cutter.utils.html_report",
+    "peptide_cutter.utils.merge_part4_txts",
+    "csv",
+    "json",
+    "pickle",
+    "shutil",
+)
+
+
+def parse_importtime(stderr: str) -> Dict[str, int]:
+    """Return cumulative import time in microseconds per module name."""
+    cumulative: Dict[str, int] = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:") :].split("|")
+        if len(fields) != 3 or not fields[1].strip().isdigit():
+            continue
+        cumulative[fields[2].strip()] = int(fields[1])
+    return cumulative
+
+
+def measure_import_time(module: str, runs: int = 5) -> Tuple[float, Dict[str, int]]:
+    """Import ``module`` in fresh interpreters; return median ms and last timings."""
+    samples: List[float] = []
+    timings: Dict[str, int] = {}
+    for _ in range(max(1, runs)):
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        timings = parse_importtime(proc.stderr)
+        if module not in timings:
+            raise ValueError(f"No import timing found for module: {module}")
+        samples.append(timings[module] / 1000.0)
+    return statistics.median(samples), timings
+
+
+def check_import_budget(
+    module: str = DEFAULT_MODULE,
+    budget_ms: float | None = DEFAULT_BUDGET_MS,
+    runs: int = 5,
+) -> List[str]:
+    """Return a list of budget violations (empty when the budget holds).
+
+    With ``budget_ms=None`` only the lazily imported modules are checked.
+    """
+    median_ms, timings = measure_import_time(module, runs=runs)
+    problems: List[str] = []
+    if budget_ms is not None and median_ms > budget_ms:
+        problems.append(
+            f"import {module} took {median_ms:.1f} ms (budget {budget_ms:.1f} ms)"
+        )
+    for name in LAZY_MODULES:
+        if name in timings:
+            problems.append(f"import {module} eagerly imports {name}")
+    return problems
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(
+        description="Check the import-time budget of the peptide-cutter CLI."
+    )
+    ap.add_argument("--module", default=DEFAULT_MODULE, help="Module to import.")
+    ap.add_argument(
+        "--budget-ms",
+        type=float,
+        default=DEFAULT_BUDGET_MS,
+        help=f"Maximum median import time in ms (default {DEFAULT_BUDGET_MS:g}).",
+    )
+    ap.add_argument(
+        "--runs", type=int, default=5, help="Number of fresh interpreters (default 5)."
+    )
+    args = ap.parse_args()
+
+    problems = check_import_budget(args.module, args.budget_ms, args.runs)
+    for problem in problems:
+        print(f"[FAIL] {problem}")
+    if problems:
+        raise SystemExit(1)
+    print(f"[OK] {args.module} is within the {args.budget_ms:g} ms import budget")
+
+
+if __name__ == "__main__":
+    main()
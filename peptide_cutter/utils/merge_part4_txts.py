@@ -7,8 +7,9 @@ import argparse
 import csv
 import os
 import re
+from bisect import bisect_left, bisect_right
 from pathlib import Path
-from typing import Dict, List, Optional, Set, Tuple
+from typing import Dict, Iterable, List, Optional, Set, Tuple
 
 ENZYME_ABBR_MAP = {
     "Arg-C proteinase": "ArgC",
@@ -224,6 +225,65 @@ def tick_number_line(start_pos: int, end_pos: int, left_pad: int, width: int) ->
     return f"{prefix}{left_num}   {ruler}   {right_num}".rstrip()
 
 
+# Sentinel row for columns no label covers.
+_NO_ROW = 1 << 62
+
+
+def staircase_tracks(
+    labels: Iterable[Tuple[int, str, int]], line_width: int
+) -> List[str]:
+    """Lay out ``(bar_col, label, first_row)`` labels; return lines top to bottom.
+
+    Each label ends just left of its bar column and goes on the lowest row at
+    or above ``first_row`` where its span is free and no label sits in its bar
+    column below it; a ``|`` bar then runs from that row down to row 0.
+    Instead of scanning a character grid, the layout keeps the sorted label
+    intervals of every row and the bar height of every column, so a placement
+    costs a bisection per candidate row plus the label length.
+    """
+    bar_top = [-1] * line_width
+    label_floor = [_NO_ROW] * line_width
+    row_starts: List[List[int]] = []
+    row_ends: List[List[int]] = []
+    placed: List[Tuple[int, int, str]] = []
+
+    for bar_col, label, first_row in labels:
+        label_start = bar_col - len(label)
+        if label_start < 0 or bar_col >= line_width:
+            raise ValueError(f"Label {label!r} does not fit before column {bar_col}.")
+        # Rows crossed by a bar inside the label span are taken.
+        row = max(first_row, max(bar_top[label_start:bar_col], default=-1) + 1)
+        while row < len(row_starts):
+            i = bisect_right(row_starts[row], bar_col - 1) - 1
+            if i < 0 or row_ends[row][i] < label_start:
+                break
+            row += 1
+        if row >= label_floor[bar_col]:
+            raise ValueError(f"No free row for label {label!r} at column {bar_col}.")
+
+        while len(row_starts) <= row:
+            row_starts.append([])
+            row_ends.append([])
+        i = bisect_left(row_starts[row], label_start)
+        row_starts[row].insert(i, label_start)
+        row_ends[row].insert(i, bar_col - 1)
+        for col in range(label_start, bar_col):
+            if label_floor[col] > row:
+                label_floor[col] = row
+        if bar_top[bar_col] < row:
+            bar_top[bar_col] = row
+        placed.append((row, label_start, label))
+
+    grid = [[" "] * line_width for _ in row_starts]
+    for row, label_start, label in placed:
+        grid[row][label_start : label_start + len(label)] = label
+    for col, top in enumerate(bar_top):
+        for row in range(top + 1):
+            if grid[row][col] == " ":
+                grid[row][col] = "|"
+    return ["".join(cells).rstrip() for cells in reversed(grid)]
+
+
 def render_block_for_enzyme(
     seq: str,
     abbr: str,
@@ -246,56 +306,9 @@ def render_block_for_enzyme(
         lines.append(number_line(block_start, block_end, left_pad, width))
         return "\n".join(lines)
 
-    label = abbr
-    rows: List[List[str]] = []
-
-    def ensure_row(r: int):
-        while len(rows) <= r:
-            rows.append([" "] * (left_pad + width))
-
-    def can_place_on_row(r: int, bar_col: int) -> bool:
-        ensure_row(r)
-        label_start = bar_col - len(label)
-        label_end = bar_col - 1
-
-        for c in range(label_start, label_end + 1):
-            if c < 0 or c >= left_pad + width:
-                return False
-            if rows[r][c] != " ":
-                return False
-
-        for rr in range(0, r + 1):
-            ensure_row(rr)
-            ch = rows[rr][bar_col]
-            if ch not in (" ", "|"):
-                return False
-
-        return True
-
-    def apply_place(r: int, bar_col: int):
-        ensure_row(r)
-        label_start = bar_col - len(label)
-
-        for i, ch in enumerate(label):
-            rows[r][label_start + i] = ch
-
-        for rr in range(0, r + 1):
-            if rows[rr][bar_col] == " ":
-                rows[rr][bar_col] = "|"
-
-    for idx in idxs:
-        bar_col = left_pad + idx
-        r = 0
-        while True:
-            if can_place_on_row(r, bar_col):
-                apply_place(r, bar_col)
-                break
-            r += 1
-
-    out_lines = []
-    for r in range(len(rows) - 1, -1, -1):
-        out_lines.append("".join(rows[r]).rstrip())
-
+    out_lines = staircase_tracks(
+        [(left_pad + idx, abbr, 0) for idx in idxs], left_pad + width
+    )
     out_lines.append((" " * left_pad) + block_seq)
     out_lines.append(number_line(block_start, block_end, left_pad, width))
     return "\n".join(out_lines)
@@ -317,6 +330,8 @@ def write_one_enzyme_txt(
     enzyme_col: str,
     pos_col: str,
     used_names: Dict[str, int],
+    layout: Optional["Part4Layout"] = None,
+    row: int = 0,
 ) -> Path:
     abbr = enzyme_abbr(enzyme_name)
 
@@ -329,8 +344,6 @@ def write_one_enzyme_txt(
         filename = f"{base}_{used_names[base]}.txt"
 
     path = out_dir / filename
-    pos = sorted({p for p in positions if 1 <= p <= len(seq)})
-    left_pad = len(abbr) + 2
 
     lines: List[str] = []
     lines.append(f">{seq_id}")
@@ -339,20 +352,11 @@ def write_one_enzyme_txt(
     lines.append(f"# CSV columns: {enzyme_col} / {pos_col}")
     lines.append("")
 
-    for block_start in range(1, len(seq) + 1, block_size):
-        lines.append(
-            render_block_for_enzyme(
-                seq=seq,
-                abbr=abbr,
-                positions_in_block=pos,
-                block_start=block_start,
-                block_size=block_size,
-                left_pad=left_pad,
-            )
-        )
-        lines.append("")
-
-    path.write_text("\n".join(lines).rstrip() + "\n", encoding="utf-8")
+    # ``row`` is the index of this enzyme in the rows ``layout`` was built from.
+    if layout is None:
+        layout, row = Part4Layout(seq, [(enzyme_name, positions)], block_size), 0
+    text = "\n".join(lines) + "\n" + layout.enzyme_text(row)
+    path.write_text(text.rstrip() + "\n", encoding="utf-8")
     return path
 
 
@@ -364,11 +368,19 @@ def generate_enzyme_txts(
     block_size: int = 60,
     enzyme_col: str = "Name of enzyme",
     pos_col: str = "Positions of cleavage sites",
+    layout: Optional["Part4Layout"] = None,
 ) -> List[Path]:
+    """Write one TXT per enzyme row into ``out_dir``.
+
+    ``layout`` may be a :class:`Part4Layout` of the same sequence, rows and
+    block size that the caller also uses for the merged track.
+    """
+    if layout is None:
+        layout = Part4Layout(seq, rows, block_size)
     out_dir.mkdir(parents=True, exist_ok=True)
     used_names: Dict[str, int] = {}
     outputs: List[Path] = []
-    for enzyme_name, positions in rows:
+    for row, (enzyme_name, positions) in enumerate(rows):
         outputs.append(
             write_one_enzyme_txt(
                 out_dir=out_dir,
@@ -380,6 +392,8 @@ def generate_enzyme_txts(
                 enzyme_col=enzyme_col,
                 pos_col=pos_col,
                 used_names=used_names,
+                layout=layout,
+                row=row,
             )
         )
     return outputs
@@ -502,61 +516,13 @@ def render_block_by_positions(
     ruler_style: str = "numbers",
 ) -> str:
     width = len(block_seq)
-    rows: List[List[str]] = []
-
-    def ensure_row(r: int):
-        while len(rows) <= r:
-            rows.append([" "] * (left_pad + width))
-
-    def can_place(label: str, r: int, bar_col: int) -> bool:
-        ensure_row(r)
-        label_start = bar_col - len(label)
-        label_end = bar_col - 1
-        if label_start < 0:
-            return False
-
-        for c in range(label_start, label_end + 1):
-            if c < 0 or c >= left_pad + width:
-                return False
-            if rows[r][c] != " ":
-                return False
-
-        for rr in range(0, r + 1):
-            ensure_row(rr)
-            ch = rows[rr][bar_col]
-            if ch not in (" ", "|"):
-                return False
-        return True
-
-    def apply(label: str, r: int, bar_col: int):
-        ensure_row(r)
-        label_start = bar_col - len(label)
-
-        for i, ch in enumerate(label):
-            rows[r][label_start + i] = ch
-
-        for rr in range(0, r + 1):
-            ensure_row(rr)
-            if rows[rr][bar_col] == " ":
-                rows[rr][bar_col] = "|"
-
+    labels: List[Tuple[int, str, int]] = []
     for idx, (abs_pos, label) in enumerate(events):
         in_block_idx = abs_pos - block_start
-        if not (0 <= in_block_idx < width):
-            continue
-        bar_col = left_pad + in_block_idx
-
-        r = idx
-        while True:
-            if can_place(label, r, bar_col):
-                apply(label, r, bar_col)
-                break
-            r += 1
-
-    out_lines = []
-    for r in range(len(rows) - 1, -1, -1):
-        out_lines.append("".join(rows[r]).rstrip())
+        if 0 <= in_block_idx < width:
+            labels.append((left_pad + in_block_idx, label, idx))
 
+    out_lines = staircase_tracks(labels, left_pad + width)
     out_lines.append((" " * left_pad) + block_seq)
     if ruler_style == "ticks":
         out_lines.append(
@@ -644,61 +610,131 @@ def merge_enzyme_txts(
     return out_path
 
 
-def render_part4_text_from_rows(
-    rows: List[Tuple[str, List[int]]],
-    seq: str,
-    block_size: int = 80,
-) -> str:
-    if not seq:
-        raise ValueError("Sequence is empty for Part 4 rendering.")
-
-    abbr_to_positions: Dict[str, Set[int]] = {}
-    enzyme_order: List[str] = []
-    for enzyme_name, positions in rows:
-        abbr = normalize_abbr(enzyme_abbr(enzyme_name))
-        abbr_to_positions[abbr] = set(positions)
-        enzyme_order.append(abbr)
+class Part4Layout:
+    """Part 4 intermediates of one sequence, shared by all Part 4 renderings.
 
-    pos_to_abbrs: Dict[int, Set[str]] = {}
-    seq_len = len(seq)
-    for abbr, pos_set in abbr_to_positions.items():
-        for p in pos_set:
-            if 1 <= p <= seq_len:
-                pos_to_abbrs.setdefault(p, set()).add(abbr)
+    Block slices, the sites of each enzyme split per block, the merged
+    position → label map and the ruler lines are computed once; the
+    per-enzyme tracks (:meth:`enzyme_text`) and the merged track
+    (:meth:`merged_text`) are rendered from them and memoized.
+    """
 
-    order_index = {a: i for i, a in enumerate(enzyme_order)}
-
-    def join_abbrs(abbrs: Set[str]) -> str:
-        items = sorted(abbrs, key=lambda x: (order_index.get(x, 10**9), x))
-        return "_".join(items)
-
-    pos_to_label: Dict[int, str] = {p: join_abbrs(s) for p, s in pos_to_abbrs.items()}
-    max_label_len = max((len(lbl) for lbl in pos_to_label.values()), default=0)
-    left_pad = max_label_len + 2
-
-    out_lines: List[str] = []
-
-    for block_start in range(1, seq_len + 1, block_size):
-        block_end = min(block_start + block_size - 1, seq_len)
-        block_seq = seq[block_start - 1 : block_end]
-
-        positions = [
-            p for p in sorted(pos_to_label.keys()) if block_start <= p <= block_end
+    def __init__(
+        self, seq: str, rows: List[Tuple[str, List[int]]], block_size: int = 80
+    ) -> None:
+        self.seq = seq
+        self.block_size = block_size
+        self.blocks: List[Tuple[int, str]] = [
+            (block_start, seq[block_start - 1 : block_start - 1 + block_size])
+            for block_start in range(1, len(seq) + 1, block_size)
         ]
-        events = [(p, pos_to_label[p]) for p in positions]
 
-        out_lines.append(
-            render_block_by_positions(
-                block_seq=block_seq,
-                block_start=block_start,
-                events=events,
-                left_pad=left_pad,
-                ruler_style="ticks",
+        # Per row: display abbreviation and sorted in-block site indexes.
+        self._tracks: List[Tuple[str, List[List[int]]]] = []
+        by_abbr: Dict[str, List[List[int]]] = {}
+        order_index: Dict[str, int] = {}
+        for order, (enzyme_name, positions) in enumerate(rows):
+            abbr = enzyme_abbr(enzyme_name)
+            per_block = self._split_positions(positions)
+            self._tracks.append((abbr, per_block))
+            merged_abbr = normalize_abbr(abbr)
+            by_abbr[merged_abbr] = per_block
+            order_index[merged_abbr] = order
+
+        # Merged labels join the abbreviations cutting at a position in row
+        # order, so walk the abbreviations in that order.
+        self._block_labels: List[Dict[int, List[str]]] = [{} for _ in self.blocks]
+        for merged_abbr in sorted(by_abbr, key=lambda a: (order_index[a], a)):
+            for labels, idxs in zip(self._block_labels, by_abbr[merged_abbr]):
+                for idx in idxs:
+                    labels.setdefault(idx, []).append(merged_abbr)
+
+        self._rulers: Dict[Tuple[int, int, str], str] = {}
+        self._enzyme_texts: Dict[int, str] = {}
+        self._merged_text: Optional[str] = None
+
+    def enzyme_text(self, row: int) -> str:
+        """Blocks of the enzyme track of ``rows[row]``, as in its per-enzyme TXT."""
+        text = self._enzyme_texts.get(row)
+        if text is None:
+            abbr, per_block = self._tracks[row]
+            left_pad = len(abbr) + 2
+            lines: List[str] = []
+            for index, idxs in enumerate(per_block):
+                block_seq = self.blocks[index][1]
+                width = len(block_seq)
+                if idxs:
+                    lines.extend(
+                        staircase_tracks(
+                            [(left_pad + idx, abbr, 0) for idx in idxs],
+                            left_pad + width,
+                        )
+                    )
+                lines.append((" " * left_pad) + block_seq)
+                lines.append(self._ruler(index, left_pad, "numbers"))
+                lines.append("")
+            text = "\n".join(lines)
+            self._enzyme_texts[row] = text
+        return text
+
+    def merged_text(self) -> str:
+        """The merged Part 4 track with combined labels and tick rulers."""
+        if not self.seq:
+            raise ValueError("Sequence is empty for Part 4 rendering.")
+        if self._merged_text is None:
+            max_label_len = max(
+                (
+                    len("_".join(abbrs))
+                    for labels in self._block_labels
+                    for abbrs in labels.values()
+                ),
+                default=0,
             )
-        )
-        out_lines.append("")
+            left_pad = max_label_len + 2
+            lines: List[str] = []
+            for index, labels in enumerate(self._block_labels):
+                block_seq = self.blocks[index][1]
+                events = sorted(labels.items())
+                lines.extend(
+                    staircase_tracks(
+                        [
+                            (left_pad + idx, "_".join(abbrs), row)
+                            for row, (idx, abbrs) in enumerate(events)
+                        ],
+                        left_pad + len(block_seq),
+                    )
+                )
+                lines.append((" " * left_pad) + block_seq)
+                lines.append(self._ruler(index, left_pad, "ticks"))
+                lines.append("")
+            self._merged_text = "\n".join(lines).rstrip() + "\n"
+        return self._merged_text
+
+    def _split_positions(self, positions: Iterable[int]) -> List[List[int]]:
+        per_block: List[List[int]] = [[] for _ in self.blocks]
+        for p in sorted({p for p in positions if 1 <= p <= len(self.seq)}):
+            block, idx = divmod(p - 1, self.block_size)
+            per_block[block].append(idx)
+        return per_block
+
+    def _ruler(self, index: int, left_pad: int, style: str) -> str:
+        key = (index, left_pad, style)
+        ruler = self._rulers.get(key)
+        if ruler is None:
+            block_start, block_seq = self.blocks[index]
+            block_end = block_start + len(block_seq) - 1
+            render = tick_number_line if style == "ticks" else number_line
+            ruler = render(block_start, block_end, left_pad, len(block_seq))
+            self._rulers[key] = ruler
+        return ruler
+
 
-    return "\n".join(out_lines).rstrip() + "\n"
+def render_part4_text_from_rows(
+    rows: List[Tuple[str, List[int]]],
+    seq: str,
+    block_size: int = 80,
+) -> str:
+    return Part4Layout(seq, rows, block_size).merged_text()
 
 
 def resolve_output_path(out_arg: str) -> Path:
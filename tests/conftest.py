@@ -0,0 +1,14 @@
+from pathlib import Path
+
+import pytest
+
+from peptide_cutter.rules import load_rules
+
+BUNDLED_RULES = (
+    Path(__file__).resolve().parents[1] / "peptide_cutter" / "cleavage_rules.json"
+)
+
+
+@pytest.fixture(scope="module")
+def bundled_rules():
+    return load_rules(str(BUNDLED_RULES))
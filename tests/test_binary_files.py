@@ -0,0 +1,13 @@
+import pytest
+
+from peptide_cutter.peptide_index import PeptideIndex
+from peptide_cutter.results_file import ResultsFile
+
+
+@pytest.mark.parametrize("reader", [ResultsFile, PeptideIndex])
+@pytest.mark.parametrize("data", [b"\0" * 256, b"not a results file at all" * 8])
+def test_rejects_other_files(tmp_path, reader, data):
+    path = tmp_path / "other.bin"
+    path.write_bytes(data)
+    with pytest.raises(ValueError):
+        reader(str(path))
@@ -0,0 +1,76 @@
+import csv
+import os
+import random
+import subprocess
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+
+def _fasta_text(count):
+    rng = random.Random(14)
+    seqs = [
+        "".join(rng.choice("ACDEFGHIKLMNPQRSTVWY") for _ in range(rng.randint(5, 80)))
+        for _ in range(40)
+    ]
+    # Every record starts with a trypsin site, so each one has CSV rows.
+    return "".join(
+        f">P{i:05d} record {i}\nAAKAA{rng.choice(seqs)}\n" for i in range(count)
+    )
+
+
+def _run_cli(args, cwd, stdin=None):
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(
+        filter(None, [str(REPO_ROOT), env.get("PYTHONPATH")])
+    )
+    return subprocess.run(
+        [sys.executable, "-m", "peptide_cutter", *args],
+        cwd=cwd,
+        input=stdin,
+        capture_output=True,
+        text=True,
+        env=env,
+    )
+
+
+def _merged_chains(out_dir):
+    path = out_dir / "results" / "csv" / "All_in_One.csv"
+    with open(path, newline="", encoding="utf-8") as f:
+        return sorted({row["Chain ID"] for row in csv.DictReader(f)})
+
+
+def test_fasta_from_a_pipe_keeps_every_record(tmp_path):
+    text = _fasta_text(300)
+    args = ["--enzymes", "Tryps", "--outputs", "csv", "--out"]
+
+    piped = _run_cli(["--fasta", "/dev/stdin", *args, "piped"], tmp_path, stdin=text)
+    assert piped.returncode == 0, piped.stderr
+
+    (tmp_path / "in.fasta").write_text(text, encoding="utf-8")
+    from_file = _run_cli(["--fasta", "in.fasta", *args, "file"], tmp_path)
+    assert from_file.returncode == 0, from_file.stderr
+
+    expected = [f"P{i:05d}" for i in range(300)]
+    assert _merged_chains(tmp_path / "piped") == expected
+    assert _merged_chains(tmp_path / "file") == expected
+
+
+def test_failed_run_leaves_no_temporary_files(tmp_path):
+    # An invalid UTF-8 byte past the first read buffer fails the run after
+    # the merged-output writers have been opened.
+    text = _fasta_text(1000).encode("utf-8")
+    (tmp_path / "bad.fasta").write_bytes(text + b">BAD\nAAKAA\xffGG\n")
+    result = _run_cli(
+        ["--fasta", "bad.fasta", "--enzymes", "Tryps", "--outputs", "csv,bin,html"],
+        tmp_path,
+    )
+    assert result.returncode == 1
+    results_dir = tmp_path / "results"
+    leftovers = [
+        path.relative_to(results_dir).as_posix()
+        for path in results_dir.rglob("*")
+        if path.name.startswith(".") or path.suffix == ".tmp"
+    ]
+    assert leftovers == []
@@ -0,0 +1,145 @@
+import json
+import random
+
+import pytest
+
+from peptide_cutter.engine import (
+    ENGINES,
+    find_cleavage_sites,
+    find_cleavage_sites_batch,
+)
+from peptide_cutter.rules import POSITIONS, load_rules
+
+AMINO_ACIDS = "ACDEFGHIKLMNPQRSTVWY"
+
+# Rules at the edges of the motif semantics, checked alongside the bundled ones.
+EDGE_ENZYMES = {
+    "Empty motif": {"cleaves": [{}]},
+    "Empty constraint": {"cleaves": [{"P1": {}}]},
+    "Include minus exclude": {
+        "cleaves": [{"P1": {"include": ["K", "R"], "exclude": ["R"]}}]
+    },
+    "Include equals exclude": {
+        "cleaves": [
+            {"P1": {"include": ["A"], "exclude": ["A"]}},
+            {"P1_prime": {"include": ["G"]}},
+        ]
+    },
+    "Outermost positions": {
+        "cleaves": [
+            {"P4": {"include": ["A", "K"]}, "P2_prime": {"exclude": ["P"]}},
+            {"P4": {"exclude": ["W"]}},
+            {"P2_prime": {"include": ["K"]}},
+        ]
+    },
+    "Block everything": {
+        "cleaves": [{"P1": {"include": ["K"]}}],
+        "blocks": [{}],
+    },
+    "Block empty constraint": {
+        "cleaves": [{"P1_prime": {"exclude": ["P"]}}],
+        "blocks": [{"P3": {}}],
+    },
+    "Block overlapping cleave": {
+        "cleaves": [
+            {"P1": {"include": ["K", "R"]}},
+            {"P1_prime": {"include": ["D"]}},
+        ],
+        "blocks": [{"P1": {"include": ["R"]}, "P1_prime": {"include": ["P", "D"]}}],
+    },
+}
+
+
+def _missing(module):
+    try:
+        __import__(module)
+    except ImportError:
+        return True
+    return False
+
+
+ENGINE_PARAMS = [
+    pytest.param(
+        name,
+        marks=pytest.mark.skipif(
+            name == "numpy" and _missing("numpy"), reason="NumPy is not installed"
+        ),
+    )
+    for name in sorted(ENGINES)
+]
+
+
+def _sequences():
+    rng = random.Random(20261017)
+    seqs = ["K", "P", "KP", "PK", "KKKKKK", "DDDDD", "AKPWRD", "W" * 6, "GKRDPE"]
+    for length in range(1, 7):
+        seqs.extend(
+            "".join(rng.choice(AMINO_ACIDS) for _ in range(length)) for _ in range(40)
+        )
+    seqs.extend(
+        "".join(rng.choice(AMINO_ACIDS) for _ in range(rng.randint(7, 300)))
+        for _ in range(40)
+    )
+    return seqs
+
+
+SEQUENCES = _sequences()
+
+
+@pytest.fixture(scope="module")
+def edge_rules(tmp_path_factory):
+    data = {
+        "schema_version": "1.1",
+        "description": "Edge cases for the engine tests.",
+        "positions": POSITIONS,
+        "cut": "between P1 and P1_prime",
+        "enzymes": EDGE_ENZYMES,
+    }
+    path = tmp_path_factory.mktemp("rules") / "edge_rules.json"
+    path.write_text(json.dumps(data), encoding="utf-8")
+    return load_rules(str(path))
+
+
+@pytest.fixture(params=["bundled", "edge"])
+def rules(request, bundled_rules, edge_rules):
+    return bundled_rules if request.param == "bundled" else edge_rules
+
+
+def _as_lists(sites_by_enzyme):
+    return {name: list(sites) for name, sites in sites_by_enzyme.items()}
+
+
+@pytest.mark.parametrize("engine", ENGINE_PARAMS)
+def test_engine_matches_reference(engine, rules):
+    enzymes = list(rules.enzymes)
+    find_sites = ENGINES[engine]
+    for seq in SEQUENCES:
+        expected = _as_lists(find_cleavage_sites(seq, rules, enzymes))
+        assert _as_lists(find_sites(seq, rules, enzymes)) == expected, seq
+
+
+@pytest.mark.parametrize("engine", ENGINE_PARAMS)
+def test_batch_matches_reference(engine, rules):
+    enzymes = list(rules.enzymes)
+    batch = find_cleavage_sites_batch(SEQUENCES, rules, enzymes, engine=engine)
+    assert len(batch) == len(SEQUENCES)
+    for index, seq in enumerate(SEQUENCES):
+        expected = _as_lists(find_cleavage_sites(seq, rules, enzymes))
+        assert _as_lists(batch.record(index)) == expected, seq
+
+
+def test_engines_accept_an_enzyme_subset(bundled_rules):
+    enzymes = ["Trypsin", "Caspase 1", "Proteinase K"]
+    seq = SEQUENCES[-1]
+    expected = _as_lists(find_cleavage_sites(seq, bundled_rules, enzymes))
+    assert list(expected) == enzymes
+    for engine in sorted(ENGINES):
+        if engine == "numpy" and _missing("numpy"):
+            continue
+        assert _as_lists(ENGINES[engine](seq, bundled_rules, enzymes)) == expected
+
+
+def test_edge_rules_reference_semantics(edge_rules):
+    sites = _as_lists(find_cleavage_sites("AKRDPK", edge_rules, list(EDGE_ENZYMES)))
+    assert sites["Include minus exclude"] == [2, 6]
+    assert sites["Block everything"] == []
@@ -0,0 +1,14 @@
+import os
+
+from peptide_cutter.utils.import_budget import check_import_budget
+
+# Wall-clock timing depends on the machine, so the millisecond budget is only
+# enforced when requested, e.g. PEPTIDE_CUTTER_IMPORT_BUDGET_MS=100.
+BUDGET_MS = os.environ.get("PEPTIDE_CUTTER_IMPORT_BUDGET_MS")
+
+
+def test_cli_import_keeps_output_stages_lazy():
+    if BUDGET_MS:
+        assert check_import_budget(budget_ms=float(BUDGET_MS)) == []
+    else:
+        assert check_import_budget(budget_ms=None, runs=1) == []
@@ -0,0 +1,102 @@
+import random
+
+import pytest
+
+from peptide_cutter.utils.merge_part4_txts import (
+    Part4Layout,
+    enzyme_abbr,
+    render_block_for_enzyme,
+    staircase_tracks,
+)
+
+
+def _grid_staircase(labels, line_width):
+    """The character-grid layout staircase_tracks replaced, kept as the oracle.
+
+    Each label is tried on successive rows from its first row until its span
+    is blank and its bar column holds only blanks or bars down to row 0.
+    """
+    rows = []
+
+    def ensure_row(r):
+        while len(rows) <= r:
+            rows.append([" "] * line_width)
+
+    def can_place(label, r, bar_col):
+        ensure_row(r)
+        label_start = bar_col - len(label)
+        if label_start < 0:
+            return False
+        if any(rows[r][c] != " " for c in range(label_start, bar_col)):
+            return False
+        for rr in range(r + 1):
+            if rows[rr][bar_col] not in (" ", "|"):
+                return False
+        return True
+
+    for bar_col, label, first_row in labels:
+        r = first_row
+        while not can_place(label, r, bar_col):
+            r += 1
+        rows[r][bar_col - len(label) : bar_col] = label
+        for rr in range(r + 1):
+            if rows[rr][bar_col] == " ":
+                rows[rr][bar_col] = "|"
+    return ["".join(cells).rstrip() for cells in reversed(rows)]
+
+
+def _random_labels(rng, merged):
+    names = ["T", "LysC", "Ch_hi", "AspN_T", "Casp1_Casp3_GzmB", "K"]
+    left_pad = max(len(name) for name in names) + 2
+    width = rng.randint(1, 60)
+    density = rng.random()
+    cols = [col for col in range(width) if rng.random() < density]
+    fixed = rng.choice(names)
+    labels = [
+        (
+            left_pad + col,
+            rng.choice(names) if merged else fixed,
+            row if merged else 0,
+        )
+        for row, col in enumerate(cols)
+    ]
+    return labels, left_pad + width
+
+
+@pytest.mark.parametrize("merged", [False, True])
+def test_staircase_matches_grid_layout(merged):
+    rng = random.Random(20 + merged)
+    for _ in range(400):
+        labels, line_width = _random_labels(rng, merged)
+        expected = _grid_staircase(labels, line_width)
+        assert staircase_tracks(labels, line_width) == expected, labels
+
+
+def test_staircase_rejects_labels_wider_than_the_padding():
+    with pytest.raises(ValueError):
+        staircase_tracks([(2, "LysC", 0)], 10)
+
+
+def test_layout_enzyme_tracks_match_per_block_rendering():
+    rng = random.Random(21)
+    names = ["Trypsin", "LysC", "Caspase 1", "Chymotrypsin-high specificity"]
+    for _ in range(50):
+        length = rng.randint(1, 200)
+        seq = "".join(rng.choice("ACDEFGHIKLMNPQRSTVWY") for _ in range(length))
+        block_size = rng.randint(10, 60)
+        rows = [
+            (name, sorted(rng.sample(range(1, length + 1), rng.randint(0, length))))
+            for name in names
+        ]
+        layout = Part4Layout(seq, rows, block_size)
+        for row, (name, positions) in enumerate(rows):
+            abbr = enzyme_abbr(name)
+            blocks = [
+                render_block_for_enzyme(
+                    seq, abbr, positions, start, block_size, len(abbr) + 2
+                )
+                for start in range(1, len(seq) + 1, block_size)
+            ]
+            # Each block is followed by a blank line, as in the per-enzyme TXT.
+            expected = "\n".join(line for block in blocks for line in (block, ""))
+            assert layout.enzyme_text(row) == expected
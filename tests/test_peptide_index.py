@@ -0,0 +1,106 @@
+import random
+
+from peptide_cutter import peptide_index
+from peptide_cutter.engine import find_cleavage_sites
+from peptide_cutter.fragments import iter_fragments
+from peptide_cutter.peptide_index import PeptideHit, PeptideIndex, build_peptide_index
+
+ENZYMES = ["Trypsin", "Asp-N endopeptidase"]
+FRAGMENT_OPTIONS = {"missed_cleavages": 1, "min_length": 2}
+
+
+def _records():
+    rng = random.Random(16)
+    records = [
+        ("sp|P1|A", "first", "MKWVTFISLLFLFSSAYSRGVFRRDTHKSEIAHRFKDLGE"),
+        ("sp|P2|B", "same sequence", "MKWVTFISLLFLFSSAYSRGVFRRDTHKSEIAHRFKDLGE"),
+        ("P3", "", "KKKK"),
+        ("P4", "", "G"),
+    ]
+    for number in range(5, 30):
+        seq = "".join(rng.choice("ACDEGKLPRSTW") for _ in range(rng.randint(1, 80)))
+        records.append((f"P{number}", "random", seq))
+    return records
+
+
+def _expected_hits(records, rules):
+    expected = {}
+    for accession, _description, seq in records:
+        sites = find_cleavage_sites(seq, rules, ENZYMES)
+        for fragment in iter_fragments(seq, sites, **FRAGMENT_OPTIONS):
+            expected.setdefault(fragment.sequence, []).append(
+                PeptideHit(accession, fragment.start, fragment.end)
+            )
+    return expected
+
+
+def _hit_order(hit, accessions):
+    return accessions.index(hit.protein), hit.start
+
+
+def test_round_trip(tmp_path, bundled_rules):
+    records = _records()
+    path = tmp_path / "peptides.pcpi"
+    counts = build_peptide_index(
+        records, str(path), bundled_rules, ENZYMES, fragment_options=FRAGMENT_OPTIONS
+    )
+    expected = _expected_hits(records, bundled_rules)
+    accessions = [accession for accession, _, _ in records]
+
+    assert counts == (
+        len(expected),
+        sum(len(hits) for hits in expected.values()),
+        len(records),
+    )
+    with PeptideIndex(str(path)) as index:
+        assert len(index) == len(expected)
+        assert [index.peptide(i) for i in range(len(index))] == sorted(expected)
+        assert [index.protein(i) for i in range(len(records))] == accessions
+        for peptide, hits in expected.items():
+            assert peptide in index
+            assert index.lookup(peptide.lower()) == sorted(
+                hits, key=lambda hit: _hit_order(hit, accessions)
+            )
+        assert index.lookup("WWWWWWWWWW") == []
+        assert "WWWWWWWWWW" not in index
+    assert list(tmp_path.iterdir()) == [path]
+
+
+def test_multi_level_merge_and_pool_match_single_run(
+    tmp_path, bundled_rules, monkeypatch
+):
+    records = _records()
+    single = tmp_path / "single.pcpi"
+    build_peptide_index(
+        records,
+        str(single),
+        bundled_rules,
+        ENZYMES,
+        fragment_options=FRAGMENT_OPTIONS,
+    )
+
+    # Many small runs merged a few at a time take the multi-level merge path.
+    monkeypatch.setattr(peptide_index, "INDEX_CHUNK_SIZE", 2)
+    monkeypatch.setattr(peptide_index, "MERGE_FAN_IN", 3)
+    merged = tmp_path / "merged.pcpi"
+    build_peptide_index(
+        records,
+        str(merged),
+        bundled_rules,
+        ENZYMES,
+        fragment_options=FRAGMENT_OPTIONS,
+    )
+    assert merged.read_bytes() == single.read_bytes()
+
+    monkeypatch.undo()
+    pooled = tmp_path / "pooled.pcpi"
+    build_peptide_index(
+        records,
+        str(pooled),
+        bundled_rules,
+        ENZYMES,
+        fragment_options=FRAGMENT_OPTIONS,
+        jobs=2,
+    )
+    assert pooled.read_bytes() == single.read_bytes()
+
@@ -0,0 +1,80 @@
+from array import array
+
+import pytest
+
+from peptide_cutter.engine import find_cleavage_sites
+from peptide_cutter.results_file import ResultsFile, ResultsFileWriter
+
+SEQUENCES = {
+    "sp|P04406|G3P_HUMAN": "MGKVKVGVNGFGRIGRLVTRAAFNSGKVDIVAINDPFIDLNYMVYMFQYDSTHG",
+    "seq_2": "LWEAFMSPHHFEKCKWYE",
+    "Ünïcode chain": "KP",
+    "seq_2_dup1": "LWEAFMSPHHFEKCKWYE",
+    "no sites": "G",
+}
+
+
+def test_round_trip_of_engine_sites(tmp_path, bundled_rules):
+    enzymes = list(bundled_rules.enzymes)
+    expected = {
+        chain_id: find_cleavage_sites(seq, bundled_rules, enzymes)
+        for chain_id, seq in SEQUENCES.items()
+    }
+    path = tmp_path / "results.pcsites"
+    with ResultsFileWriter(str(path), enzymes) as writer:
+        for chain_id, sites in expected.items():
+            writer.add(chain_id, sites)
+
+    with ResultsFile(str(path)) as results:
+        assert len(results) == len(SEQUENCES)
+        assert results.enzymes == enzymes
+        assert list(results.chain_ids()) == list(SEQUENCES)
+        assert results.site_count == sum(
+            len(sites)
+            for by_enzyme in expected.values()
+            for sites in by_enzyme.values()
+        )
+        for index, (chain_id, by_enzyme) in enumerate(expected.items()):
+            assert results.chain_sites(chain_id) == by_enzyme
+            assert results.chain_sites(index) == by_enzyme
+            for name, sites in by_enzyme.items():
+                assert results.sites(chain_id, name) == sites
+    assert list(tmp_path.iterdir()) == [path]
+
+
+def test_enzymes_missing_from_a_chain_have_no_sites(tmp_path):
+    path = tmp_path / "results.pcsites"
+    with ResultsFileWriter(str(path), ["Trypsin", "LysC"]) as writer:
+        writer.add("a", {"LysC": [3, 9]})
+        writer.add("b", {})
+
+    with ResultsFile(str(path)) as results:
+        assert results.sites("a", "Trypsin") == array("I")
+        assert results.sites("a", "LysC") == array("I", [3, 9])
+        assert results.chain_sites("b") == {"Trypsin": array("I"), "LysC": array("I")}
+        with pytest.raises(KeyError):
+            results.sites("a", "Pepsin")
+        with pytest.raises(KeyError):
+            results.chain_sites("c")
+        with pytest.raises(IndexError):
+            results.chain_sites(2)
+
+
+def test_empty_results_file(tmp_path):
+    path = tmp_path / "results.pcsites"
+    ResultsFileWriter(str(path), ["Trypsin"]).close()
+
+    with ResultsFile(str(path)) as results:
+        assert len(results) == 0
+        assert results.site_count == 0
+        assert results.enzymes == ["Trypsin"]
+
+
+def test_failed_write_leaves_no_file(tmp_path):
+    path = tmp_path / "results.pcsites"
+    with pytest.raises(RuntimeError):
+        with ResultsFileWriter(str(path), ["Trypsin"]) as writer:
+            writer.add("a", {"Trypsin": [1]})
+            raise RuntimeError("interrupted")
+    assert list(tmp_path.iterdir()) == []
+